@@ -3,17 +3,42 @@ Orastria API - Personalized Astrology Book Generator
 Deploy on Railway.app
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import requests
+import hashlib
+import io
+import json
 import os
-import tempfile
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from functools import lru_cache, partial
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
+from botocore.exceptions import ClientError
 from datetime import datetime
+from urllib.parse import quote
 import uuid
 
-from book_generator import OrastriaBookGenerator
+import render_service
+from book_generator import COPY_FINGERPRINT, PAGE_TEMPLATE_VERSION, STATIC_LAYER_VERSION, font_set
+from cache import ResultCache, SingleFlight, cache_db_path
+from cpus import available_cpus
+from gazetteer import gazetteer, normalize_place
+from tz_offsets import to_utc
+from charts import (
+    CHART_PROVIDER, CHART_PROVIDER_FALLBACK, PROKERALA_DEADLINE, PROKERALA_KUNDLI_URL,
+    PROKERALA_PLANET_URL, chart_args, chart_cache_key, chart_from_prokerala, fallback_provider,
+    prokerala_request,
+)
+from jobs import JobQueue, QueueFullError
+from pipeline import Pipeline, StageFullError
+from upstream import UPSTREAM_CONNECT_TIMEOUT, LatencyHistogram, get_session, upstream_stats
+import ephemeris
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -28,186 +53,415 @@ B2_BUCKET_NAME = os.environ.get('B2_BUCKET_NAME', 'orastria-books')
 B2_ENDPOINT = os.environ.get('B2_ENDPOINT', 'https://s3.us-west-004.backblazeb2.com')
 
 # ============== PROKERALA API ==============
-def get_prokerala_token():
-    """Get OAuth token from Prokerala"""
-    url = "https://api.prokerala.com/token"
-    data = {
-        'grant_type': 'client_credentials',
-        'client_id': PROKERALA_CLIENT_ID,
-        'client_secret': PROKERALA_CLIENT_SECRET
-    }
-    response = requests.post(url, data=data)
-    response.raise_for_status()
-    return response.json()['access_token']
+PROKERALA_TOKEN_URL = "https://api.prokerala.com/token"
+# Read timeout per Prokerala call (the connect timeout is UPSTREAM_CONNECT_TIMEOUT)
+PROKERALA_TIMEOUT = float(os.environ.get('PROKERALA_TIMEOUT', 10))
+
+# Pooled keep-alive session; the token POST is safe to retry too
+prokerala_http = get_session(
+    'prokerala',
+    timeout=(UPSTREAM_CONNECT_TIMEOUT, PROKERALA_TIMEOUT),
+    retry_methods=('GET', 'POST'),
+)
+# Refresh this many seconds before the token actually expires
+PROKERALA_TOKEN_REFRESH_MARGIN = int(os.environ.get('PROKERALA_TOKEN_REFRESH_MARGIN', 60))
 
 
-def get_birth_chart(birth_date, birth_time, latitude, longitude, timezone):
+class ProkeralaTokenManager:
     """
-    Get birth chart from Prokerala API
-    
-    birth_date: "1998-09-06"
-    birth_time: "18:30"
-    latitude: 34.3989
-    longitude: 35.8972
-    timezone: "Asia/Beirut"
+    Process-wide cache for the Prokerala OAuth token.
+
+    The token is reused until `expires_in` (minus a safety margin) runs out.
+    Only one thread refreshes at a time; the others wait on the lock and then
+    pick up the fresh token instead of requesting their own. Counters have
+    their own lock so cache hits never wait behind a refresh.
+    """
+
+    def __init__(self, refresh_margin=PROKERALA_TOKEN_REFRESH_MARGIN):
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _is_fresh(self):
+        return self._token is not None and time.monotonic() < self._expires_at - self.refresh_margin
+
+    def _count(self, counter):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _fetch(self, deadline=None):
+        data = self.credentials()
+        response = prokerala_http.post(PROKERALA_TOKEN_URL, data=data, deadline=deadline)
+        response.raise_for_status()
+        return self._parse(response.json())
+
+    @staticmethod
+    def _parse(payload):
+        # Prokerala tokens last an hour; assume that if expires_in is missing
+        expires_in = float(payload.get('expires_in', 3600))
+        return payload['access_token'], time.monotonic() + expires_in
+
+    def credentials(self):
+        """Form body for POST /token"""
+        return {
+            'grant_type': 'client_credentials',
+            'client_id': PROKERALA_CLIENT_ID,
+            'client_secret': PROKERALA_CLIENT_SECRET
+        }
+
+    def peek(self):
+        """The cached token if it is still fresh (counted as a hit), else None"""
+        token = self._token
+        if self._is_fresh():
+            self._count('hits')
+            return token
+        return None
+
+    def get_token(self, deadline=None):
+        """
+        Return a valid access token, refreshing it if needed. With a
+        `deadline` (time.monotonic() value) neither the wait for another
+        thread's refresh nor our own may run past it.
+        """
+        token = self._token
+        if self._is_fresh():
+            self._count('hits')
+            return token
+
+        timeout = -1 if deadline is None else max(0, deadline - time.monotonic())
+        if not self._lock.acquire(timeout=timeout):
+            raise requests.Timeout("Prokerala deadline passed waiting for a token refresh")
+        try:
+            # Another thread may have refreshed while we were waiting
+            if self._is_fresh():
+                self._count('hits')
+                return self._token
+            self._count('misses')
+            self._token, self._expires_at = self._fetch(deadline)
+            self._count('refreshes')
+            return self._token
+        finally:
+            self._lock.release()
+
+    def invalidate(self, stale_token):
+        """
+        Drop the cached token after the API rejected `stale_token` (a 401).
+        A no-op if another thread has already replaced it, so concurrent
+        401s cause one refresh rather than one each.
+        """
+        with self._lock:
+            if self._token == stale_token:
+                self._token = None
+                self._expires_at = 0.0
+
+    def stats(self):
+        with self._stats_lock:
+            hits, misses, refreshes = self.hits, self.misses, self.refreshes
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'refreshes': refreshes,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+            'expires_in': max(0, round(self._expires_at - time.monotonic())) if self._token else 0,
+        }
+
+
+prokerala_tokens = ProkeralaTokenManager()
+
+
+def get_prokerala_token(deadline=None):
+    """Get OAuth token from Prokerala (cached until shortly before expiry)"""
+    return prokerala_tokens.get_token(deadline)
+
+
+# Shared pool so planet-position and kundli run side by side
+prokerala_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('PROKERALA_MAX_WORKERS', 8)),
+    thread_name_prefix='prokerala'
+)
+
+
+def prokerala_get(url, params, deadline=None):
+    """
+    GET a Prokerala endpoint with the cached token, retrying once on 401.
+    Token refresh, attempts and retries all stop at `deadline`, so a call
+    we stop waiting for frees its executor thread in time.
+    """
+    token = get_prokerala_token(deadline)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = prokerala_http.get(url, headers=headers, params=params, deadline=deadline)
+    if response.status_code == 401:
+        # Token was revoked or expired early - fetch a new one and retry once
+        prokerala_tokens.invalidate(token)
+        headers = {"Authorization": f"Bearer {get_prokerala_token(deadline)}"}
+        response = prokerala_http.get(url, headers=headers, params=params, deadline=deadline)
+    return response
+
+
+def fetch_prokerala_chart(birth_date, birth_time, latitude, longitude, timezone, executor=None):
+    """
+    Fetch planet positions and kundli concurrently on `executor`
+    (prokerala_executor unless the caller has its own pool).
+    Returns (datetime_str, planet_response, kundli_response); the kundli
+    response is None if that call failed or missed the deadline.
     """
-    token = get_prokerala_token()
+    executor = executor or prokerala_executor
+    datetime_str, params = prokerala_request(birth_date, birth_time, latitude, longitude, timezone)
     
-    # Combine date and time
-    datetime_str = f"{birth_date}T{birth_time}:00{get_tz_offset(timezone)}"
+    # The deadline also bounds each call's token refresh, attempts and
+    # retries, so calls we stop waiting for don't keep holding executor threads
+    deadline = time.monotonic() + PROKERALA_DEADLINE
+    planet_future = executor.submit(prokerala_get, PROKERALA_PLANET_URL, params, deadline)
+    kundli_future = executor.submit(prokerala_get, PROKERALA_KUNDLI_URL, params, deadline)
     
-    url = "https://api.prokerala.com/v2/astrology/planet-position"
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {
-        "ayanamsa": 1,  # Lahiri (required by API)
-        "coordinates": f"{latitude},{longitude}",
-        "datetime": datetime_str
-    }
+    try:
+        planet_response = planet_future.result(timeout=max(0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        planet_future.cancel()
+        kundli_future.cancel()
+        raise requests.Timeout(f"Prokerala planet-position exceeded {PROKERALA_DEADLINE}s deadline")
+    except requests.RequestException:
+        kundli_future.cancel()
+        raise
     
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
+    # The ascendant is nice to have - never fail the chart because of it
+    try:
+        kundli_response = kundli_future.result(timeout=max(0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        kundli_future.cancel()
+        print("⚠️ Prokerala kundli missed the deadline")
+        kundli_response = None
+    except requests.RequestException as e:
+        print(f"⚠️ Prokerala kundli error: {e}")
+        kundli_response = None
     
-    data = response.json()['data']
-    
-    # Also get the ascendant/rising sign
-    asc_url = "https://api.prokerala.com/v2/astrology/kundli"
-    asc_response = requests.get(asc_url, headers=headers, params=params)
-    asc_data = asc_response.json()['data'] if asc_response.ok else None
-    
-    return parse_chart_data(data, asc_data)
-
-
-def get_tz_offset(timezone):
-    """Get timezone offset string like +03:00"""
-    # Common timezone offsets - expand as needed
-    offsets = {
-        'Asia/Beirut': '+02:00',
-        'America/New_York': '-05:00',
-        'America/Chicago': '-06:00',
-        'America/Los_Angeles': '-08:00',
-        'Europe/London': '+00:00',
-        'Europe/Paris': '+01:00',
-        'Asia/Dubai': '+04:00',
-        'Asia/Kolkata': '+05:30',
-        'Australia/Sydney': '+11:00',
-        'UTC': '+00:00'
-    }
-    return offsets.get(timezone, '+00:00')
+    return datetime_str, planet_response, kundli_response
 
 
-def parse_chart_data(planet_data, kundli_data):
-    """Parse Prokerala response into our format - converts to Western/Tropical zodiac"""
-    
-    zodiac_signs = [
-        'Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
-        'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces'
-    ]
-    
-    # Ayanamsa offset (Lahiri) - approximately 24 degrees in 2024
-    # This converts from Sidereal to Tropical
-    AYANAMSA = 24.0
-    
-    chart = {
-        'sun_sign': 'Unknown',
-        'moon_sign': 'Unknown',
-        'rising_sign': 'Unknown',
-        'mercury': 'Unknown',
-        'venus': 'Unknown',
-        'mars': 'Unknown',
-        'jupiter': 'Unknown',
-        'saturn': 'Unknown'
-    }
+# ============== CHART CACHE ==============
+chart_cache = ResultCache(
+    'chart',
+    max_entries=int(os.environ.get('CHART_CACHE_SIZE', 4096)),
+    ttl=int(os.environ.get('CHART_CACHE_TTL', 30 * 86400)),
+    db_path=cache_db_path('charts.sqlite3'),
+    max_disk_entries=int(os.environ.get('CHART_CACHE_DISK_SIZE', 200000)),
+)
+
+
+def get_birth_chart(birth_date, birth_time, latitude, longitude, timezone, executor=None):
+    """
+    Get birth chart, from the chart cache when possible.
+    `executor` is the pool for upstream provider calls (see CHART_PROVIDERS).
     
-    # Prokerala returns planet_position as a list
-    planets = planet_data.get('planet_position', [])
-    
-    # Map planet names to our keys
-    planet_name_map = {
-        'Sun': 'sun_sign',
-        'Moon': 'moon_sign',
-        'Mercury': 'mercury',
-        'Venus': 'venus',
-        'Mars': 'mars',
-        'Jupiter': 'jupiter',
-        'Saturn': 'saturn',
-        'Ascendant': 'rising_sign'
-    }
+    birth_date: "1998-09-06"
+    birth_time: "18:30"
+    latitude: 34.3989
+    longitude: 35.8972
+    timezone: "Asia/Beirut"
+    """
+    args = chart_args(birth_date, birth_time, latitude, longitude, timezone)
     
-    def longitude_to_tropical_sign(longitude):
-        """Convert longitude to tropical/Western zodiac sign"""
-        # Add ayanamsa to convert from sidereal to tropical
-        tropical_longitude = (longitude + AYANAMSA) % 360
-        sign_index = int(tropical_longitude / 30)
-        return zodiac_signs[sign_index]
+    provider = CHART_PROVIDER
+    key = chart_cache_key(*args, provider)
+    chart = chart_cache.get(key)
+    if chart is not None:
+        return chart
     
-    for planet in planets:
-        planet_name = planet.get('name', '')
-        
-        # Get the longitude (absolute position in degrees)
-        longitude = planet.get('longitude', 0)
-        
-        # Convert to tropical/Western sign
-        if longitude > 0:
-            sign_name = longitude_to_tropical_sign(longitude)
-        else:
-            # Fallback to rasi if longitude not available
-            rasi = planet.get('rasi', {})
-            rasi_id = rasi.get('id', -1)
-            if 0 <= rasi_id < 12:
-                # Add ayanamsa offset (roughly 1 sign = ~24 degrees)
-                tropical_rasi_id = (rasi_id + 1) % 12  # Approximate 1 sign offset
-                sign_name = zodiac_signs[tropical_rasi_id]
-            else:
-                sign_name = 'Unknown'
-        
-        # Map to our chart
-        if planet_name in planet_name_map:
-            chart[planet_name_map[planet_name]] = sign_name
+    try:
+        chart = CHART_PROVIDERS[provider](*args, executor)
+    except requests.RequestException as e:
+        fallback = fallback_provider(provider, e)
+        if fallback is None:
+            raise
+        provider = fallback
+        key = chart_cache_key(*args, provider)
+        chart = CHART_PROVIDERS[provider](*args, executor)
     
+    # Callers can tell a fallback chart from a primary one
+    chart['provider'] = provider
+    chart_cache.set(key, chart)
     return chart
 
 
+def fetch_birth_chart(birth_date, birth_time, latitude, longitude, timezone, executor=None):
+    """Get birth chart from Prokerala API (uncached)"""
+    _, response, asc_response = fetch_prokerala_chart(birth_date, birth_time, latitude, longitude, timezone, executor)
+    return chart_from_prokerala(response, asc_response, birth_date, birth_time)
+
+
+def compute_local_chart(birth_date, birth_time, latitude, longitude, timezone, executor=None):
+    """Compute the chart offline with the bundled ephemeris (tropical, no API call, so no executor)"""
+    utc_dt = to_utc(timezone, birth_date, birth_time)
+    return ephemeris.compute_chart(utc_dt, latitude, longitude)
+
+
+# ============== CHART PROVIDERS ==============
+# Each provider takes (birth_date, birth_time, latitude, longitude, timezone,
+# executor) and returns the chart dict produced by parse_chart_data; executor
+# is the thread pool for its upstream calls (None for the default)
+CHART_PROVIDERS = {
+    'prokerala': fetch_birth_chart,
+    'local': compute_local_chart,
+}
+for _name in (CHART_PROVIDER, CHART_PROVIDER_FALLBACK):
+    if _name and _name not in CHART_PROVIDERS:
+        raise ValueError(f"Unknown chart provider {_name!r}, expected one of {sorted(CHART_PROVIDERS)}")
+
+
 # ============== BACKBLAZE UPLOAD ==============
-def upload_to_b2(file_path, file_name):
-    """Upload PDF to Backblaze B2 and return public URL"""
+MB = 1024 * 1024
+# Full books above the threshold go up as parallel multipart uploads (B2 parts must be >= 5 MB)
+B2_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=int(os.environ.get('B2_MULTIPART_THRESHOLD_MB', 8)) * MB,
+    multipart_chunksize=int(os.environ.get('B2_MULTIPART_CHUNK_MB', 8)) * MB,
+    max_concurrency=int(os.environ.get('B2_UPLOAD_CONCURRENCY', 4)),
+    use_threads=True,
+)
+
+_b2_client = None
+_b2_client_lock = threading.Lock()
+
+
+class UploadStats:
+    """Upload count, bytes and duration histogram for /metrics"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.bytes = 0
+
+    def observe(self, elapsed_ms, size, error=False):
+        self.histogram.observe(elapsed_ms, error=error)
+        if not error:
+            self.bytes += size
+
+    def stats(self):
+        return {**self.histogram.stats(), 'bytes': self.bytes}
+
+
+b2_upload_stats = UploadStats()
+
+
+def get_b2_client():
+    """
+    One S3 client per worker process. boto3 clients are thread-safe, so all
+    request threads share it (and its connection pool). Built lazily so
+    each forked gunicorn worker gets its own.
+    """
+    global _b2_client
+    if _b2_client is None:
+        with _b2_client_lock:
+            if _b2_client is None:
+                _b2_client = boto3.client(
+                    's3',
+                    endpoint_url=B2_ENDPOINT,
+                    aws_access_key_id=B2_KEY_ID,
+                    aws_secret_access_key=B2_APP_KEY,
+                    config=Config(
+                        signature_version='s3v4',
+                        s3={'addressing_style': 'path'},
+                        max_pool_connections=int(os.environ.get('B2_MAX_POOL_CONNECTIONS', 16)),
+                    )
+                )
+    return _b2_client
+
+
+def b2_public_url(file_name):
+    """Public URL of an object (for public buckets), with the key percent-encoded"""
+    return f"https://f005.backblazeb2.com/file/{B2_BUCKET_NAME}/{quote(file_name)}"
+
+
+def upload_to_b2(pdf, file_name):
+    """
+    Upload PDF to Backblaze B2 and return public URL
     
+    pdf: the PDF bytes, a readable binary file object, or a file path
+    """
+    start = time.perf_counter()
+    size = 0
     try:
-        s3 = boto3.client(
-            's3',
-            endpoint_url=B2_ENDPOINT,
-            aws_access_key_id=B2_KEY_ID,
-            aws_secret_access_key=B2_APP_KEY,
-            config=Config(
-                signature_version='s3v4',
-                s3={'addressing_style': 'path'}
-            )
-        )
+        if isinstance(pdf, (bytes, bytearray, memoryview)):
+            size = len(pdf)
+            fileobj = io.BytesIO(pdf)
+        elif isinstance(pdf, (str, os.PathLike)):
+            size = os.path.getsize(pdf)
+            fileobj = open(pdf, 'rb')
+        else:
+            fileobj = pdf
         
-        # Upload file
-        with open(file_path, 'rb') as f:
-            s3.put_object(
-                Bucket=B2_BUCKET_NAME,
-                Key=file_name,
-                Body=f,
-                ContentType='application/pdf'
+        try:
+            get_b2_client().upload_fileobj(
+                fileobj,
+                B2_BUCKET_NAME,
+                file_name,
+                ExtraArgs={'ContentType': 'application/pdf'},
+                Config=B2_TRANSFER_CONFIG,
             )
+        finally:
+            if fileobj is not pdf:
+                fileobj.close()
         
-        # Generate public URL (for public buckets)
-        public_url = f"https://f005.backblazeb2.com/file/{B2_BUCKET_NAME}/{file_name}"
+        b2_upload_stats.observe((time.perf_counter() - start) * 1000, size)
         
-        return public_url
+        return b2_public_url(file_name)
         
     except Exception as e:
+        b2_upload_stats.observe((time.perf_counter() - start) * 1000, size, error=True)
         raise Exception(f"B2 Upload failed: {str(e)}")
 
 
 # ============== GEOCODING ==============
+# Load the timezone polygons fully into RAM instead of reading them lazily
+TIMEZONE_IN_MEMORY = os.environ.get('TIMEZONE_IN_MEMORY', '0') == '1'
+# Build the TimezoneFinder at import so the first request doesn't pay for it
+TIMEZONE_WARMUP = os.environ.get('TIMEZONE_WARMUP', '1') == '1'
+# Coordinates are bucketed to this many decimals (3 = ~100m) for the lookup cache
+TIMEZONE_BUCKET_PRECISION = int(os.environ.get('TIMEZONE_BUCKET_PRECISION', 3))
+
+_timezone_finder = None
+_timezone_finder_lock = threading.Lock()
+
+
+def get_timezone_finder():
+    """Shared TimezoneFinder for this worker, built on first use"""
+    global _timezone_finder
+    if _timezone_finder is None:
+        with _timezone_finder_lock:
+            if _timezone_finder is None:
+                from timezonefinder import TimezoneFinder
+                _timezone_finder = TimezoneFinder(in_memory=TIMEZONE_IN_MEMORY)
+    return _timezone_finder
+
+
+@lru_cache(maxsize=int(os.environ.get('TIMEZONE_CACHE_SIZE', 16384)))
+def timezone_at_bucket(lat, lon):
+    """timezone_at for an already-rounded coordinate bucket"""
+    return get_timezone_finder().timezone_at(lat=lat, lng=lon)
+
+
+def warm_up_timezone_finder():
+    """Load the timezone data and touch it once"""
+    try:
+        timezone_at_bucket(0.0, 0.0)
+        print("✅ TimezoneFinder ready")
+    except ImportError:
+        print("⚠️ timezonefinder not installed")
+    except Exception as e:
+        print(f"⚠️ timezonefinder warm-up failed: {e}")
+
+
 def get_timezone_from_coords(lat, lon):
     """Get timezone from coordinates using timezonefinder (offline)"""
     try:
-        from timezonefinder import TimezoneFinder
-        tf = TimezoneFinder()
-        timezone = tf.timezone_at(lat=lat, lng=lon)
+        timezone = timezone_at_bucket(
+            round(lat, TIMEZONE_BUCKET_PRECISION),
+            round(lon, TIMEZONE_BUCKET_PRECISION)
+        )
         if timezone:
             print(f"✅ Timezone found: {timezone}")
             return timezone
@@ -231,12 +485,57 @@ def get_timezone_from_coords(lat, lon):
         return 'Asia/Tokyo'
 
 
-def geocode_location(place_name):
+if TIMEZONE_WARMUP:
+    warm_up_timezone_finder()
+
+
+# Bump when place resolution changes so stale coordinates aren't served
+GEOCODE_CACHE_VERSION = 2
+
+geocode_cache = ResultCache(
+    'geocode',
+    max_entries=int(os.environ.get('GEOCODE_CACHE_SIZE', 8192)),
+    ttl=int(os.environ.get('GEOCODE_CACHE_TTL', 90 * 86400)),
+    db_path=cache_db_path('geocode.sqlite3'),
+)
+
+
+def geocode_cache_key(place_name):
+    return f"v{GEOCODE_CACHE_VERSION}|{normalize_place(place_name)}"
+
+
+def geocode_coordinates(place_name):
     """
-    Get latitude, longitude, and timezone for a place
-    Using a free geocoding service
+    Resolve a place to (lat, lon): cache first, then the offline
+    gazetteer, and only then Nominatim
     """
-    # Using Nominatim (free, no API key needed)
+    key = geocode_cache_key(place_name)
+    cached = geocode_cache.get(key)
+    if cached is not None:
+        return cached[0], cached[1]
+    
+    coords = gazetteer.lookup(place_name)
+    if coords is None:
+        coords = nominatim_search(place_name)
+    
+    geocode_cache.set(key, list(coords))
+    return coords
+
+
+# Nominatim's usage policy allows one request per second and bans clients
+# that keep going after a 429, so calls are spaced per process (give each
+# gunicorn worker its share: NOMINATIM_MIN_INTERVAL = workers seconds) and a
+# 429 is returned rather than retried
+NOMINATIM_MIN_INTERVAL = float(os.environ.get('NOMINATIM_MIN_INTERVAL', 1.0))
+nominatim_http = get_session(
+    'nominatim',
+    retry_statuses=(500, 502, 503, 504),
+    min_interval=NOMINATIM_MIN_INTERVAL,
+)
+
+
+def nominatim_search(place_name):
+    """Look a place up on Nominatim (free, no API key, 1 req/s policy)"""
     url = "https://nominatim.openstreetmap.org/search"
     params = {
         'q': place_name,
@@ -245,21 +544,533 @@ def geocode_location(place_name):
     }
     headers = {'User-Agent': 'OrastriaApp/1.0'}
     
-    response = requests.get(url, params=params, headers=headers)
+    response = nominatim_http.get(url, params=params, headers=headers)
     response.raise_for_status()
     
     results = response.json()
     if not results:
         raise ValueError(f"Could not find location: {place_name}")
     
-    lat = float(results[0]['lat'])
-    lon = float(results[0]['lon'])
+    return float(results[0]['lat']), float(results[0]['lon'])
+
+
+def geocode_location(place_name):
+    """
+    Get latitude, longitude, and timezone for a place
+    """
+    lat, lon = geocode_coordinates(place_name)
     
     # Get timezone using offline library (no API call)
     timezone = get_timezone_from_coords(lat, lon)
     
     return lat, lon, timezone
 
+# ============== BATCH CHARTS ==============
+BATCH_MAX_RECORDS = int(os.environ.get('BATCH_MAX_RECORDS', 1000))
+
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 8))
+
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix='batch')
+# Batch charts make their Prokerala calls on their own pool, so a large batch
+# can't queue interactive /chart calls behind it (and onto their deadline).
+# Two calls per chart, so no batch call waits for a thread either.
+batch_prokerala_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('BATCH_PROKERALA_WORKERS', 2 * BATCH_MAX_WORKERS)),
+    thread_name_prefix='batch-prokerala'
+)
+
+
+def _batch_result(location, chart):
+    return {'success': True, 'location': location, 'chart': chart}
+
+
+def _job_result(job, location):
+    if 'error' in job:
+        return {'error': job['error']}
+    return _batch_result(location, job['chart'])
+
+
+def get_birth_charts(records):
+    """
+    Charts for many birth records at once.
+    
+    Each record has birth_date and birth_time plus either birth_place or
+    latitude/longitude (timezone optional). Places are geocoded once each on
+    the batch pool, and a record's chart is looked up or started as soon as
+    its location is known, so cached charts stream back while other places
+    are still resolving. Identical charts are computed once. Yields
+    (index, result) pairs as charts become ready, so the order is not the
+    input order.
+    """
+    jobs = {}           # chart key -> job: 'records' while computing, then 'chart' or 'error'
+    waiting = {}        # place key -> [(index, birth_date, birth_time)] until geocoded
+    pending = {}        # future -> place key (geocode) or job (remote chart)
+    local_misses = []   # jobs for the local engine, computed together
+    
+    def add_chart(index, birth_date, birth_time, latitude, longitude, timezone):
+        # Same location /chart reports; only the chart is shared at rounded coordinates
+        location = {'latitude': latitude, 'longitude': longitude, 'timezone': timezone}
+        args = chart_args(birth_date, birth_time, latitude, longitude, timezone)
+        key = chart_cache_key(*args, CHART_PROVIDER)
+        job = jobs.get(key)
+        if job is None:
+            chart = chart_cache.get(key)
+            if chart is not None:
+                job = jobs[key] = {'chart': chart}
+            else:
+                job = jobs[key] = {'key': key, 'args': args, 'records': []}
+                if CHART_PROVIDER == 'local':
+                    local_misses.append(job)
+                else:
+                    future = batch_executor.submit(get_birth_chart, *args, executor=batch_prokerala_executor)
+                    pending[future] = job
+        if 'records' in job:
+            job['records'].append((index, location))
+        else:
+            yield index, _job_result(job, location)
+    
+    def finish(job):
+        for index, location in job.pop('records'):
+            yield index, _job_result(job, location)
+    
+    def place_resolved(place_key, future):
+        records_here = waiting.pop(place_key)
+        try:
+            latitude, longitude, timezone = future.result()
+        except (ValueError, requests.RequestException) as e:
+            for index, _, _ in records_here:
+                yield index, {'error': str(e)}
+            return
+        for index, birth_date, birth_time in records_here:
+            try:
+                yield from add_chart(index, birth_date, birth_time, latitude, longitude, timezone)
+            except (TypeError, ValueError) as e:
+                yield index, {'error': str(e)}
+    
+    def compute_local():
+        # The local engine does every chart queued so far in one vectorized pass
+        batch = local_misses[:]
+        del local_misses[:]
+        if not batch:
+            return
+        charts = ephemeris.compute_charts(
+            [to_utc(job['args'][4], job['args'][0], job['args'][1]) for job in batch],
+            [job['args'][2] for job in batch],
+            [job['args'][3] for job in batch],
+        )
+        for job, chart in zip(batch, charts):
+            chart['provider'] = 'local'
+            chart_cache.set(job['key'], chart)
+            job['chart'] = chart
+            yield from finish(job)
+    
+    # Step 1: start every geocode and every chart whose coordinates are given
+    for index, record in enumerate(records):
+        try:
+            birth_date = record['birth_date']
+            birth_time = record['birth_time']
+            if 'latitude' in record and 'longitude' in record:
+                latitude = float(record['latitude'])
+                longitude = float(record['longitude'])
+                timezone = record.get('timezone') or get_timezone_from_coords(latitude, longitude)
+                yield from add_chart(index, birth_date, birth_time, latitude, longitude, timezone)
+            else:
+                place_key = normalize_place(record['birth_place'])
+                if place_key not in waiting:
+                    waiting[place_key] = []
+                    pending[batch_executor.submit(geocode_location, record['birth_place'])] = place_key
+                waiting[place_key].append((index, birth_date, birth_time))
+        except KeyError as e:
+            yield index, {'error': f'Missing required field: {e.args[0]}'}
+        except (TypeError, ValueError, requests.RequestException) as e:
+            yield index, {'error': str(e)}
+    yield from compute_local()
+    
+    # Step 2: as geocodes land, look up or start their charts; as remote
+    # charts land, hand them to every record that shares them
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            item = pending.pop(future)
+            if isinstance(item, str):
+                yield from place_resolved(item, future)
+                continue
+            try:
+                item['chart'] = future.result()
+            except Exception as e:
+                item['error'] = str(e)
+            yield from finish(item)
+        yield from compute_local()
+
+
+# ============== BOOK PIPELINE ==============
+GENERATE_REQUIRED_FIELDS = ['name', 'birth_date', 'birth_time', 'birth_place']
+
+
+# Each /generate step runs on its own bounded pool: (workers, max waiting).
+# Network stages get more threads; render is CPU-bound, one per usable CPU
+# (the container's quota, not the host's cores).
+generate_pipeline = Pipeline({
+    'geocode': (8, 64),
+    'timezone': (2, 64),
+    'chart': (8, 64),
+    'render': (render_service.RENDER_PROCESSES or available_cpus(), 32),
+    'upload': (8, 64),
+})
+
+
+def prepare_person(data, progress=None):
+    """Steps 1-4 of /generate: geocode, chart and display formatting"""
+    progress = progress or (lambda step: None)
+    
+    # Parse inputs
+    birth_date = data['birth_date']  # "1998-09-06"
+    birth_time = data['birth_time']  # "18:30"
+    birth_place = data['birth_place']
+    
+    # Step 1: Geocode the birth place
+    progress('geocoding')
+    latitude, longitude = generate_pipeline.run('geocode', geocode_coordinates, birth_place)
+    progress('timezone')
+    timezone = generate_pipeline.run('timezone', get_timezone_from_coords, latitude, longitude)
+    
+    # Step 2: Get birth chart from Prokerala
+    progress('chart')
+    chart = generate_pipeline.run('chart', get_birth_chart, birth_date, birth_time, latitude, longitude, timezone)
+    
+    return person_record(data, chart), chart
+
+
+def person_record(data, chart):
+    """Steps 3-4: the display-formatted person data the book is rendered from"""
+    birth_date = data['birth_date']
+    birth_time = data['birth_time']
+    
+    # Step 3: Format birth date for display
+    date_obj = datetime.strptime(birth_date, "%Y-%m-%d")
+    formatted_date = date_obj.strftime("%B %d, %Y")
+    
+    # Format birth time for display
+    time_obj = datetime.strptime(birth_time, "%H:%M")
+    formatted_time = time_obj.strftime("%I:%M %p")
+    
+    # Step 4: Build person data
+    return {
+        'name': data['name'],
+        'birth_date': formatted_date,
+        'birth_time': formatted_time,
+        'birth_place': data['birth_place'],
+        'sun_sign': chart['sun_sign'],
+        'moon_sign': chart['moon_sign'],
+        'rising_sign': chart['rising_sign'],
+        'venus': chart['venus'],
+        'mars': chart['mars'],
+        'mercury': chart['mercury'],
+    }
+
+
+def generate_response(person_data, chart, download_url, book_type):
+    """The JSON body /generate returns on success"""
+    return {
+        'success': True,
+        'download_url': download_url,
+        'person': {
+            'name': person_data['name'],
+            'sun_sign': chart['sun_sign'],
+            'moon_sign': chart['moon_sign'],
+            'rising_sign': chart['rising_sign']
+        },
+        'chart_provider': chart.get('provider'),
+        'book_type': book_type
+    }
+
+
+def book_file_name(name):
+    """Storage key for a new book: books/<name>_<random id>.pdf"""
+    file_id = str(uuid.uuid4())[:8]
+    safe_name = name.lower().replace(' ', '_')
+    return f"books/{safe_name}_{file_id}.pdf"
+
+
+# ============== CONTENT-ADDRESSED BOOKS ==============
+# With B2_CONTENT_ADDRESSED=1 a book's object name is a hash of everything
+# that goes into it, so a repeat customer gets the stored PDF back without
+# rendering or uploading again. Bump BOOK_TEMPLATE_VERSION when the layout
+# changes in a way the generator's own version numbers don't capture.
+B2_CONTENT_ADDRESSED = os.environ.get('B2_CONTENT_ADDRESSED', '0') == '1'
+BOOK_TEMPLATE_VERSION = os.environ.get('BOOK_TEMPLATE_VERSION', '1')
+
+# Object names known to exist in the bucket, so most hits skip the HEAD request
+book_index = ResultCache(
+    'books',
+    max_entries=4096,
+    ttl=int(os.environ.get('BOOK_INDEX_TTL', 30 * 86400)),
+    db_path=cache_db_path('books.sqlite3'),
+)
+book_store_counts = {'reused': 0, 'stored': 0, 'head_errors': 0}
+_book_store_lock = threading.Lock()
+
+
+def count_book_store(counter):
+    """Bump one of book_store_counts; request threads race on a bare +="""
+    with _book_store_lock:
+        book_store_counts[counter] += 1
+
+
+def content_file_name(person_data, book_type):
+    """
+    Storage key for a content-addressed book: books/<name>_<input hash>.pdf.
+    The hash covers the registered fonts too, so a book rendered with
+    fallback fonts isn't reused once the real fonts are installed.
+    """
+    template = (BOOK_TEMPLATE_VERSION, PAGE_TEMPLATE_VERSION, STATIC_LAYER_VERSION, COPY_FINGERPRINT, font_set())
+    blob = json.dumps({'person': person_data, 'book_type': book_type, 'template': template}, sort_keys=True)
+    digest = hashlib.sha256(blob.encode('utf-8')).hexdigest()[:32]
+    safe_name = person_data['name'].lower().replace(' ', '_')
+    return f"books/{safe_name}_{digest}.pdf"
+
+
+def stored_book_exists(file_name):
+    """Local index first, then a HEAD on the bucket; errors count as a miss"""
+    if book_index.get(file_name):
+        return True
+    try:
+        get_b2_client().head_object(Bucket=B2_BUCKET_NAME, Key=file_name)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+            count_book_store('head_errors')
+            print(f"⚠️ HEAD {file_name} failed: {e}")
+        return False
+    except Exception as e:
+        count_book_store('head_errors')
+        print(f"⚠️ HEAD {file_name} failed: {e}")
+        return False
+    book_index.set(file_name, True)
+    return True
+
+
+def store_book(pdf_bytes, file_name):
+    """upload_to_b2, remembering content-addressed names in the local index"""
+    download_url = upload_to_b2(pdf_bytes, file_name)
+    if B2_CONTENT_ADDRESSED:
+        book_index.set(file_name, True)
+        count_book_store('stored')
+    return download_url
+
+
+def book_store_stats():
+    with _book_store_lock:
+        counts = dict(book_store_counts)
+    return {
+        'content_addressed': B2_CONTENT_ADDRESSED,
+        **counts,
+        'index': book_index.stats(),
+    }
+
+
+def run_generate(data, progress=None):
+    """The full /generate pipeline: chart, render, upload. Returns the response body."""
+    progress = progress or (lambda step: None)
+    book_type = data.get('book_type', 'sample')
+    
+    person_data, chart = prepare_person(data, progress)
+    
+    if B2_CONTENT_ADDRESSED:
+        file_name = content_file_name(person_data, book_type)
+        if stored_book_exists(file_name):
+            count_book_store('reused')
+            return generate_response(person_data, chart, b2_public_url(file_name), book_type)
+    else:
+        file_name = book_file_name(data['name'])
+    
+    # Step 5: Generate PDF in memory
+    progress('rendering')
+    pdf_bytes = generate_pipeline.run('render', render_service.render_pdf, person_data, book_type=book_type)
+    
+    # Step 6: Upload to Backblaze
+    progress('uploading')
+    download_url = generate_pipeline.run('upload', store_book, pdf_bytes, file_name)
+    
+    return generate_response(person_data, chart, download_url, book_type)
+
+
+def generate_error(e):
+    """Map a pipeline exception to (error body, HTTP status)"""
+    if isinstance(e, ValueError):
+        return {'error': str(e)}, 400
+    if isinstance(e, StageFullError):
+        return {'error': f'Busy: {str(e)}'}, 503
+    if isinstance(e, requests.RequestException):
+        return {'error': f'API error: {str(e)}'}, 502
+    return {'error': f'Server error: {str(e)}'}, 500
+
+
+# ============== REQUEST COALESCING ==============
+# Double-submitted checkouts and client retries resend identical /generate
+# payloads. Concurrent copies share one pipeline run; exact repeats within
+# GENERATE_DEDUP_TTL get the first run's response (and download_url).
+GENERATE_DEDUP_TTL = int(os.environ.get('GENERATE_DEDUP_TTL', 600))
+
+generate_flight = SingleFlight('generate')
+generate_results = ResultCache(
+    'generate',
+    max_entries=int(os.environ.get('GENERATE_DEDUP_MAX_ENTRIES', 1024)),
+    ttl=GENERATE_DEDUP_TTL,
+    db_path=cache_db_path('generate.sqlite3'),
+)
+
+
+def generate_key(data):
+    """Canonical hash of everything that changes the generated book"""
+    canonical = {
+        'name': ' '.join(str(data['name']).split()),
+        'birth_date': str(data['birth_date']).strip(),
+        'birth_time': str(data['birth_time']).strip(),
+        'birth_place': normalize_place(data['birth_place']),
+        'book_type': data.get('book_type', 'sample'),
+    }
+    blob = json.dumps(canonical, sort_keys=True)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def generate_once(data, progress=None):
+    """
+    run_generate, deduplicated against in-flight and recent identical requests.
+    A caller that joins an in-flight run gets that run's progress steps.
+    """
+    if GENERATE_DEDUP_TTL <= 0:
+        return run_generate(data, progress)
+    key = generate_key(data)
+    cached = generate_results.get(key)
+    if cached is not None:
+        return cached
+    return generate_flight.do_with_progress(key, partial(_generate_and_remember, key, data), progress)
+
+
+def _generate_and_remember(key, data, progress):
+    # A request that finished between our cache check and taking the lead
+    cached = generate_results.get(key)
+    if cached is not None:
+        return cached
+    result = run_generate(data, progress)
+    generate_results.set(key, result)
+    return result
+
+
+# ============== STREAMED DELIVERY ==============
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Uploads that run alongside a streamed response
+background_uploads = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('BACKGROUND_UPLOAD_WORKERS', 4)),
+    thread_name_prefix='upload'
+)
+
+
+def wants_stream(data):
+    """Whether /generate should return the PDF itself instead of a download URL"""
+    flag = data.get('stream', request.args.get('stream'))
+    return flag in (True, 1, '1', 'true', 'yes')
+
+
+def _upload_in_background(pdf_bytes, file_name):
+    try:
+        store_book(pdf_bytes, file_name)
+    except Exception as e:
+        print(f"⚠️ Background upload of {file_name} failed: {e}")
+
+
+_UNSAFE_FILENAME = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def content_disposition(file_name):
+    """
+    inline Content-Disposition for any name. Header values must be Latin-1,
+    so filename= gets an ASCII-only copy and filename* (RFC 6266) the real
+    UTF-8 name for clients that understand it.
+    """
+    file_name = os.path.basename(file_name)
+    ascii_name = unicodedata.normalize('NFKD', file_name).encode('ascii', 'ignore').decode('ascii')
+    ascii_name = _UNSAFE_FILENAME.sub('_', ascii_name).strip('_') or 'book.pdf'
+    return f"inline; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(file_name, safe='')}"
+
+
+def stream_headers(data, person_data, chart, pdf_bytes, book_type):
+    """
+    Response headers for a streamed book; starts the background upload
+    when the request asked for one.
+    X-Download-Url is where that upload will land, not proof that it did:
+    the upload finishes after the response starts and can still fail, in
+    which case the link never resolves. X-Upload-Status says which case
+    ('stored' already exists, 'pending' is still uploading).
+    """
+    if B2_CONTENT_ADDRESSED:
+        file_name = content_file_name(person_data, book_type)
+    else:
+        file_name = book_file_name(data['name'])
+    headers = {
+        'Content-Disposition': content_disposition(file_name),
+        'X-Sun-Sign': chart['sun_sign'],
+        'X-Moon-Sign': chart['moon_sign'],
+        'X-Rising-Sign': chart['rising_sign'],
+        'X-Chart-Provider': chart.get('provider', ''),
+    }
+    if data.get('upload') in (True, 1, '1', 'true', 'yes'):
+        if B2_CONTENT_ADDRESSED and stored_book_exists(file_name):
+            count_book_store('reused')
+            headers['X-Upload-Status'] = 'stored'
+        else:
+            background_uploads.submit(_upload_in_background, pdf_bytes, file_name)
+            headers['X-Upload-Status'] = 'pending'
+        headers['X-Download-Url'] = b2_public_url(file_name)
+    # Let browser clients read the custom headers cross-origin
+    headers['Access-Control-Expose-Headers'] = ', '.join(h for h in headers if h.startswith('X-'))
+    return headers
+
+
+def pdf_chunks(pdf_bytes):
+    view = memoryview(pdf_bytes)
+    for offset in range(0, len(view), STREAM_CHUNK_SIZE):
+        yield bytes(view[offset:offset + STREAM_CHUNK_SIZE])
+
+
+def stream_book(data):
+    """
+    Render the book and send it back as a chunked application/pdf response.
+    With "upload": true the B2 upload runs in the background at the same time
+    and its future URL is returned in the X-Download-Url header (which may
+    never resolve if that upload fails - see stream_headers).
+    """
+    book_type = data.get('book_type', 'sample')
+    person_data, chart = prepare_person(data)
+    pdf_bytes = generate_pipeline.run('render', render_service.render_pdf, person_data, book_type=book_type)
+    headers = stream_headers(data, person_data, chart, pdf_bytes, book_type)
+    return Response(pdf_chunks(pdf_bytes), mimetype='application/pdf', headers=headers)
+
+
+# ============== ASYNC JOBS ==============
+# Opt in per request with "async": true (or ?async=1); GENERATE_ASYNC=1 makes it the default
+GENERATE_ASYNC = os.environ.get('GENERATE_ASYNC', '0') == '1'
+
+generate_jobs = JobQueue(
+    generate_once,
+    generate_error,
+    max_workers=int(os.environ.get('JOB_WORKERS', 2)),
+    max_queue=int(os.environ.get('JOB_MAX_QUEUE', 100)),
+    db_path=cache_db_path('jobs.sqlite3'),
+    ttl=int(os.environ.get('JOB_TTL', 86400)),
+    name='generate',
+)
+
+
+def wants_async(data):
+    """Whether this /generate call should be queued instead of run inline"""
+    flag = data.get('async', request.args.get('async'))
+    if flag is None:
+        return GENERATE_ASYNC
+    return flag in (True, 1, '1', 'true', 'yes')
+
+
 # ============== API ENDPOINTS ==============
 @app.route('/health', methods=['GET'])
 def health():
@@ -267,9 +1078,32 @@ def health():
     return jsonify({'status': 'ok', 'service': 'orastria-api'})
 
 
-@app.route('/debug-fonts', methods=['GET'])
-def debug_fonts():
-    """Debug endpoint to check font availability"""
+def metrics_snapshot():
+    """Everything /metrics reports, as a plain dict"""
+    return {
+        'prokerala_token': prokerala_tokens.stats(),
+        'chart_cache': chart_cache.stats(),
+        'geocode_cache': geocode_cache.stats(),
+        'gazetteer': gazetteer.stats(),
+        'timezone_cache': timezone_at_bucket.cache_info()._asdict(),
+        'upstreams': upstream_stats(),
+        'b2_upload': b2_upload_stats.stats(),
+        'book_store': book_store_stats(),
+        'generate_jobs': generate_jobs.stats(),
+        'generate_dedup': {**generate_flight.stats(), 'results': generate_results.stats()},
+        'render': render_service.stats(),
+        'pipeline': generate_pipeline.stats(),
+    }
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Cache and upstream counters for this worker"""
+    return jsonify(metrics_snapshot())
+
+
+def font_debug_info():
+    """Font search paths and the fonts actually registered"""
     import subprocess
     import glob
     
@@ -313,17 +1147,17 @@ def debug_fonts():
     except Exception as e:
         info['nix_dir_error'] = str(e)
     
-    from book_generator import FONT_REGULAR, FONT_BOLD, FONTS_AVAILABLE, dejavu_regular, dejavu_bold
-    
-    info.update({
-        'fonts_available': FONTS_AVAILABLE,
-        'font_regular': FONT_REGULAR,
-        'font_bold': FONT_BOLD,
-        'dejavu_regular_path': dejavu_regular,
-        'dejavu_bold_path': dejavu_bold,
-    })
+    from book_generator import ensure_fonts, font_info
     
-    return jsonify(info)
+    ensure_fonts()
+    info.update(font_info())
+    return info
+
+
+@app.route('/debug-fonts', methods=['GET'])
+def debug_fonts():
+    """Debug endpoint to check font availability"""
+    return jsonify(font_debug_info())
 
 
 @app.route('/debug-chart', methods=['POST'])
@@ -338,28 +1172,12 @@ def debug_chart():
         
         latitude, longitude, timezone = geocode_location(birth_place)
         
-        # Get token
-        token = get_prokerala_token()
-        
-        # Build datetime
-        datetime_str = f"{birth_date}T{birth_time}:00{get_tz_offset(timezone)}"
-        
-        # Call Prokerala
-        url = "https://api.prokerala.com/v2/astrology/planet-position"
-        headers = {"Authorization": f"Bearer {token}"}
-        params = {
-            "ayanamsa": 1,
-            "coordinates": f"{latitude},{longitude}",
-            "datetime": datetime_str
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
+        # Same concurrent fetch that production charts use
+        datetime_str, response, asc_response = fetch_prokerala_chart(
+            birth_date, birth_time, latitude, longitude, timezone
+        )
         planet_data = response.json()
-        
-        # Get kundli too
-        asc_url = "https://api.prokerala.com/v2/astrology/kundli"
-        asc_response = requests.get(asc_url, headers=headers, params=params)
-        kundli_data = asc_response.json() if asc_response.ok else None
+        kundli_data = asc_response.json() if asc_response is not None and asc_response.ok else None
         
         return jsonify({
             'datetime_used': datetime_str,
@@ -383,90 +1201,99 @@ def generate_book():
         "birth_date": "1998-09-06",
         "birth_time": "18:30",
         "birth_place": "Zgharta, Lebanon",
-        "book_type": "sample"  // or "full"
+        "book_type": "sample",  // or "full"
+        "async": false,         // true: return a job id at once, poll /jobs/<id>
+        "stream": false,        // true: respond with the PDF itself (application/pdf)
+        "upload": false         // with stream: also upload to B2 in the background
     }
     """
     try:
-        data = request.json
+        # Unparseable JSON is the client's error, as in asgi.generate_book
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
         
         # Validate required fields
-        required = ['name', 'birth_date', 'birth_time', 'birth_place']
-        for field in required:
+        for field in GENERATE_REQUIRED_FIELDS:
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Parse inputs
-        name = data['name']
-        birth_date = data['birth_date']  # "1998-09-06"
-        birth_time = data['birth_time']  # "18:30"
-        birth_place = data['birth_place']
-        book_type = data.get('book_type', 'sample')
-        email = data.get('email', '')
-        
-        # Step 1: Geocode the birth place
-        latitude, longitude, timezone = geocode_location(birth_place)
-        
-        # Step 2: Get birth chart from Prokerala
-        chart = get_birth_chart(birth_date, birth_time, latitude, longitude, timezone)
-        
-        # Step 3: Format birth date for display
-        date_obj = datetime.strptime(birth_date, "%Y-%m-%d")
-        formatted_date = date_obj.strftime("%B %d, %Y")
+        if wants_stream(data):
+            return stream_book(data)
         
-        # Format birth time for display
-        time_obj = datetime.strptime(birth_time, "%H:%M")
-        formatted_time = time_obj.strftime("%I:%M %p")
+        if wants_async(data):
+            try:
+                job_id = generate_jobs.submit(data)
+            except QueueFullError as e:
+                return jsonify({'error': str(e)}), 503
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f'/jobs/{job_id}',
+                'result_url': f'/jobs/{job_id}/result',
+            }), 202
         
-        # Step 4: Build person data
-        person_data = {
-            'name': name,
-            'birth_date': formatted_date,
-            'birth_time': formatted_time,
-            'birth_place': birth_place,
-            'sun_sign': chart['sun_sign'],
-            'moon_sign': chart['moon_sign'],
-            'rising_sign': chart['rising_sign'],
-            'venus': chart['venus'],
-            'mars': chart['mars'],
-            'mercury': chart['mercury'],
-        }
-        
-        # Step 5: Generate PDF
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
-            tmp_path = tmp.name
-        
-        generator = OrastriaBookGenerator(tmp_path, person_data, book_type=book_type)
-        generator.build()
-        
-        # Step 6: Upload to Backblaze
-        file_id = str(uuid.uuid4())[:8]
-        safe_name = name.lower().replace(' ', '_')
-        file_name = f"books/{safe_name}_{file_id}.pdf"
-        
-        download_url = upload_to_b2(tmp_path, file_name)
-        
-        # Clean up temp file
-        os.unlink(tmp_path)
-        
-        # Return success response
-        return jsonify({
-            'success': True,
-            'download_url': download_url,
-            'person': {
-                'name': name,
-                'sun_sign': chart['sun_sign'],
-                'moon_sign': chart['moon_sign'],
-                'rising_sign': chart['rising_sign']
-            },
-            'book_type': book_type
-        })
+        return jsonify(generate_once(data))
         
-    except ValueError as e:
-        return jsonify({'error': str(e)}), 400
-    except requests.RequestException as e:
-        return jsonify({'error': f'API error: {str(e)}'}), 502
     except Exception as e:
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        error, status_code = generate_error(e)
+        return jsonify(error), status_code
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status and progress of an async /generate job"""
+    job = generate_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """The /generate response of a finished job (202 while it is still pending)"""
+    job = generate_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if job['status'] in ('queued', 'running'):
+        return jsonify({'status': job['status'], 'progress': job['progress']}), 202
+    return jsonify(job['result']), job['status_code']
+
+
+@app.route('/charts/batch', methods=['POST'])
+def get_charts_batch():
+    """
+    Birth charts for many people in one call
+    
+    Expected JSON body:
+    {
+        "records": [
+            {"birth_date": "1998-09-06", "birth_time": "18:30", "birth_place": "Zgharta, Lebanon"},
+            {"birth_date": "1990-01-01", "birth_time": "08:00", "latitude": 40.71, "longitude": -74.0},
+            ...
+        ]
+    }
+    
+    Streams one NDJSON line per record as it completes:
+    {"index": 0, "success": true, "location": {...}, "chart": {...}}
+    {"index": 1, "error": "..."}
+    """
+    data = request.json or {}
+    records = data.get('records')
+    if not isinstance(records, list):
+        return jsonify({'error': 'Missing required field: records'}), 400
+    if len(records) > BATCH_MAX_RECORDS:
+        return jsonify({'error': f'Too many records (max {BATCH_MAX_RECORDS})'}), 400
+    
+    def stream():
+        try:
+            for index, result in get_birth_charts(records):
+                yield json.dumps({'index': index, **result}) + '\n'
+        except Exception as e:
+            yield json.dumps({'error': f'Server error: {str(e)}'}) + '\n'
+    
+    return Response(stream_with_context(stream()), mimetype='application/x-ndjson')
 
 
 @app.route('/chart', methods=['POST'])
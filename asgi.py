@@ -0,0 +1,469 @@
+"""
+Orastria ASGI entry point
+The same routes and JSON bodies as app.py, served from an event loop.
+Nominatim and Prokerala calls go through httpx.AsyncClient, so a single
+process can hold hundreds of in-flight chart requests; rendering, B2
+uploads, SQLite cache reads and other blocking work run in the thread
+pool. Caches, job queue and counters are shared with app.py, and the
+chart logic (request parameters, parsing, cache keys, provider fallback)
+comes from charts.py; this module only adds the async I/O around it.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+or under gunicorn:
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+import app as core
+import charts
+from cache import AsyncSingleFlight
+from upstream import (
+    UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT, LatencyHistogram, retry_delay,
+)
+
+# Connections per upstream; this, not worker count, bounds concurrent calls
+ASYNC_MAX_CONNECTIONS = int(os.environ.get('ASYNC_MAX_CONNECTIONS', 200))
+
+# ============== ASYNC UPSTREAMS ==============
+_clients = {}
+# Retry budget, retryable methods/statuses and rate limit come from the
+# matching sync session
+_policies = {
+    'nominatim': core.nominatim_http,
+    'prokerala': core.prokerala_http,
+}
+async_histograms = {
+    'nominatim': LatencyHistogram(),
+    'prokerala': LatencyHistogram(),
+}
+
+
+def _make_client(read_timeout, headers=None):
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(read_timeout, connect=UPSTREAM_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=ASYNC_MAX_CONNECTIONS,
+        ),
+        headers=headers,
+    )
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    """One pooled client per upstream for the life of the process"""
+    _clients['nominatim'] = _make_client(UPSTREAM_READ_TIMEOUT, {'User-Agent': 'OrastriaApp/1.0'})
+    _clients['prokerala'] = _make_client(core.PROKERALA_TIMEOUT)
+    # Loading cities500 takes seconds; do it before serving, off the loop
+    await run_in_threadpool(core.gazetteer.load)
+    try:
+        yield
+    finally:
+        for client in _clients.values():
+            await client.aclose()
+        _clients.clear()
+
+
+async def upstream_request(name, method, url, **kwargs):
+    """
+    Request with the same policy as the sync session for `name`: connect
+    errors always retried, read errors and its retry statuses only for its
+    retry methods, retry_delay() between attempts (Retry-After ignored),
+    the last response returned as is, and every attempt spaced by the
+    session's rate limiter (shared with the sync app's threads)
+    """
+    client = _clients[name]
+    policy = _policies[name]
+    retryable = method.upper() in policy.retry_methods
+    start = time.perf_counter()
+    error = True
+    try:
+        for attempt in range(policy.retries + 1):
+            last = attempt == policy.retries
+            if policy.limiter is not None:
+                await asyncio.sleep(policy.limiter.reserve())
+            try:
+                response = await client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if last:
+                    raise
+            except httpx.TransportError:
+                if last or not retryable:
+                    raise
+            else:
+                if last or not retryable or response.status_code not in policy.retry_statuses:
+                    error = response.status_code >= 500 or response.status_code == 429
+                    return response
+            await asyncio.sleep(retry_delay(attempt + 1))
+    finally:
+        async_histograms[name].observe((time.perf_counter() - start) * 1000, error=error)
+
+
+# ============== PROKERALA ==============
+async def get_prokerala_token(deadline=None):
+    """
+    The sync app's cached token. A refresh (about once an hour) goes through
+    app.get_prokerala_token in the thread pool, so both entry points share
+    one token flow and its lock. Cancelling us doesn't stop that thread, so
+    it gets the deadline too.
+    """
+    token = core.prokerala_tokens.peek()
+    if token is not None:
+        return token
+    return await run_in_threadpool(core.get_prokerala_token, deadline)
+
+
+async def prokerala_get(url, params, deadline=None):
+    """GET a Prokerala endpoint with the cached token, retrying once on 401"""
+    token = await get_prokerala_token(deadline)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await upstream_request('prokerala', 'GET', url, headers=headers, params=params)
+    if response.status_code == 401:
+        core.prokerala_tokens.invalidate(token)
+        headers = {"Authorization": f"Bearer {await get_prokerala_token(deadline)}"}
+        response = await upstream_request('prokerala', 'GET', url, headers=headers, params=params)
+    return response
+
+
+async def fetch_prokerala_chart(birth_date, birth_time, latitude, longitude, timezone):
+    """Async fetch_prokerala_chart: planet positions and kundli side by side"""
+    datetime_str, params = charts.prokerala_request(birth_date, birth_time, latitude, longitude, timezone)
+
+    deadline = time.monotonic() + charts.PROKERALA_DEADLINE
+    planet_task = asyncio.ensure_future(prokerala_get(charts.PROKERALA_PLANET_URL, params, deadline))
+    kundli_task = asyncio.ensure_future(prokerala_get(charts.PROKERALA_KUNDLI_URL, params, deadline))
+
+    try:
+        planet_response = await asyncio.wait_for(planet_task, max(0, deadline - time.monotonic()))
+    except asyncio.TimeoutError:
+        kundli_task.cancel()
+        raise httpx.TimeoutException(f"Prokerala planet-position exceeded {charts.PROKERALA_DEADLINE}s deadline")
+    except BaseException:
+        kundli_task.cancel()
+        raise
+
+    # The ascendant is nice to have - never fail the chart because of it
+    try:
+        kundli_response = await asyncio.wait_for(kundli_task, max(0, deadline - time.monotonic()))
+    except asyncio.TimeoutError:
+        print("⚠️ Prokerala kundli missed the deadline")
+        kundli_response = None
+    except httpx.HTTPError as e:
+        print(f"⚠️ Prokerala kundli error: {e}")
+        kundli_response = None
+
+    return datetime_str, planet_response, kundli_response
+
+
+async def fetch_birth_chart(birth_date, birth_time, latitude, longitude, timezone):
+    """Get birth chart from Prokerala API (uncached)"""
+    _, response, asc_response = await fetch_prokerala_chart(birth_date, birth_time, latitude, longitude, timezone)
+    return charts.chart_from_prokerala(response, asc_response, birth_date, birth_time)
+
+
+async def compute_chart(provider, *args):
+    if provider == 'prokerala':
+        return await fetch_birth_chart(*args)
+    # Offline providers are CPU work
+    return await run_in_threadpool(core.CHART_PROVIDERS[provider], *args)
+
+
+async def get_birth_chart(birth_date, birth_time, latitude, longitude, timezone):
+    """Async get_birth_chart: same cache keys, provider and fallback"""
+    args = charts.chart_args(birth_date, birth_time, latitude, longitude, timezone)
+
+    provider = charts.CHART_PROVIDER
+    key = charts.chart_cache_key(*args, provider)
+    chart = await run_in_threadpool(core.chart_cache.get, key)
+    if chart is not None:
+        return chart
+
+    try:
+        chart = await compute_chart(provider, *args)
+    except httpx.HTTPError as e:
+        fallback = charts.fallback_provider(provider, e)
+        if fallback is None:
+            raise
+        provider = fallback
+        key = charts.chart_cache_key(*args, provider)
+        chart = await compute_chart(provider, *args)
+
+    chart['provider'] = provider
+    await run_in_threadpool(core.chart_cache.set, key, chart)
+    return chart
+
+
+# ============== GEOCODING ==============
+async def nominatim_search(place_name):
+    """Look a place up on Nominatim (free, no API key, 1 req/s policy)"""
+    params = {'q': place_name, 'format': 'json', 'limit': 1}
+    response = await upstream_request('nominatim', 'GET', "https://nominatim.openstreetmap.org/search", params=params)
+    response.raise_for_status()
+    results = response.json()
+    if not results:
+        raise ValueError(f"Could not find location: {place_name}")
+    return float(results[0]['lat']), float(results[0]['lon'])
+
+
+async def geocode_location(place_name):
+    """(lat, lon, timezone): cache, then gazetteer, then Nominatim"""
+    key = core.geocode_cache_key(place_name)
+    cached = await run_in_threadpool(core.geocode_cache.get, key)
+    if cached is not None:
+        lat, lon = cached[0], cached[1]
+    else:
+        coords = await run_in_threadpool(core.gazetteer.lookup, place_name)
+        if coords is None:
+            coords = await nominatim_search(place_name)
+        await run_in_threadpool(core.geocode_cache.set, key, list(coords))
+        lat, lon = coords
+    timezone = await run_in_threadpool(core.get_timezone_from_coords, lat, lon)
+    return lat, lon, timezone
+
+
+# ============== BOOK PIPELINE ==============
+async def prepare_person(data):
+    latitude, longitude, timezone = await geocode_location(data['birth_place'])
+    chart = await get_birth_chart(data['birth_date'], data['birth_time'], latitude, longitude, timezone)
+    return core.person_record(data, chart), chart
+
+
+async def render(person_data, book_type):
+    """Render on the pipeline's render stage, off the event loop"""
+    return await run_in_threadpool(
+        core.generate_pipeline.run, 'render', core.render_service.render_pdf, person_data, book_type=book_type
+    )
+
+
+async def run_generate(data):
+    """Async run_generate: chart, render, upload. Returns the response body."""
+    book_type = data.get('book_type', 'sample')
+    person_data, chart = await prepare_person(data)
+
+    if core.B2_CONTENT_ADDRESSED:
+        file_name = core.content_file_name(person_data, book_type)
+        if await run_in_threadpool(core.stored_book_exists, file_name):
+            core.count_book_store('reused')
+            return core.generate_response(person_data, chart, core.b2_public_url(file_name), book_type)
+    else:
+        file_name = core.book_file_name(data['name'])
+
+    pdf_bytes = await render(person_data, book_type)
+    download_url = await run_in_threadpool(
+        core.generate_pipeline.run, 'upload', core.store_book, pdf_bytes, file_name
+    )
+    return core.generate_response(person_data, chart, download_url, book_type)
+
+
+async_generate_flight = AsyncSingleFlight('generate')
+
+
+async def _generate_and_remember(key, data):
+    cached = await run_in_threadpool(core.generate_results.get, key)
+    if cached is not None:
+        return cached
+    result = await run_generate(data)
+    await run_in_threadpool(core.generate_results.set, key, result)
+    return result
+
+
+async def generate_once(data):
+    """run_generate, deduplicated like app.generate_once (one task per key)"""
+    if core.GENERATE_DEDUP_TTL <= 0:
+        return await run_generate(data)
+    key = core.generate_key(data)
+    cached = await run_in_threadpool(core.generate_results.get, key)
+    if cached is not None:
+        return cached
+    return await async_generate_flight.do(key, _generate_and_remember, key, data)
+
+
+def async_error(e):
+    """generate_error for the async clients' exceptions"""
+    if isinstance(e, httpx.HTTPError):
+        return {'error': f'API error: {str(e)}'}, 502
+    return core.generate_error(e)
+
+
+def _flag(value):
+    return value in (True, 1, '1', 'true', 'yes')
+
+
+async def _json_body(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+# ============== ENDPOINTS ==============
+async def health(request):
+    return JSONResponse({'status': 'ok', 'service': 'orastria-api'})
+
+
+async def metrics(request):
+    snapshot = await run_in_threadpool(core.metrics_snapshot)
+    snapshot['async_upstreams'] = {name: h.stats() for name, h in async_histograms.items()}
+    snapshot['async_generate'] = async_generate_flight.stats()
+    return JSONResponse(snapshot)
+
+
+async def debug_fonts(request):
+    return JSONResponse(await run_in_threadpool(core.font_debug_info))
+
+
+async def debug_chart(request):
+    try:
+        data = await _json_body(request)
+        birth_date = data['birth_date']
+        birth_time = data['birth_time']
+        latitude, longitude, timezone = await geocode_location(data['birth_place'])
+
+        datetime_str, response, asc_response = await fetch_prokerala_chart(
+            birth_date, birth_time, latitude, longitude, timezone
+        )
+        kundli_data = asc_response.json() if asc_response is not None and asc_response.is_success else None
+        return JSONResponse({
+            'datetime_used': datetime_str,
+            'planet_response': response.json(),
+            'kundli_response': kundli_data
+        })
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+async def generate_book(request):
+    """Same body and responses as app.generate_book"""
+    try:
+        data = await _json_body(request)
+        if not isinstance(data, dict):
+            return JSONResponse({'error': 'Request body must be a JSON object'}, status_code=400)
+
+        for field in core.GENERATE_REQUIRED_FIELDS:
+            if field not in data:
+                return JSONResponse({'error': f'Missing required field: {field}'}, status_code=400)
+
+        if _flag(data.get('stream', request.query_params.get('stream'))):
+            book_type = data.get('book_type', 'sample')
+            person_data, chart = await prepare_person(data)
+            pdf_bytes = await render(person_data, book_type)
+            headers = await run_in_threadpool(core.stream_headers, data, person_data, chart, pdf_bytes, book_type)
+            return StreamingResponse(core.pdf_chunks(pdf_bytes), media_type='application/pdf', headers=headers)
+
+        use_async = data.get('async', request.query_params.get('async'))
+        if core.GENERATE_ASYNC if use_async is None else _flag(use_async):
+            try:
+                job_id = await run_in_threadpool(core.generate_jobs.submit, data)
+            except core.QueueFullError as e:
+                return JSONResponse({'error': str(e)}, status_code=503)
+            return JSONResponse({
+                'success': True,
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f'/jobs/{job_id}',
+                'result_url': f'/jobs/{job_id}/result',
+            }, status_code=202)
+
+        return JSONResponse(await generate_once(data))
+
+    except Exception as e:
+        error, status_code = async_error(e)
+        return JSONResponse(error, status_code=status_code)
+
+
+async def get_job(request):
+    job = await run_in_threadpool(core.generate_jobs.get, request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({'error': 'Unknown job'}, status_code=404)
+    return JSONResponse(job)
+
+
+async def get_job_result(request):
+    job = await run_in_threadpool(core.generate_jobs.get, request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({'error': 'Unknown job'}, status_code=404)
+    if job['status'] in ('queued', 'running'):
+        return JSONResponse({'status': job['status'], 'progress': job['progress']}, status_code=202)
+    return JSONResponse(job['result'], status_code=job['status_code'])
+
+
+async def get_charts_batch(request):
+    data = await _json_body(request) or {}
+    records = data.get('records')
+    if not isinstance(records, list):
+        return JSONResponse({'error': 'Missing required field: records'}, status_code=400)
+    if len(records) > core.BATCH_MAX_RECORDS:
+        return JSONResponse({'error': f'Too many records (max {core.BATCH_MAX_RECORDS})'}, status_code=400)
+
+    def stream():
+        # Sync generator: Starlette iterates it in the thread pool
+        try:
+            for index, result in core.get_birth_charts(records):
+                yield json.dumps({'index': index, **result}) + '\n'
+        except Exception as e:
+            yield json.dumps({'error': f'Server error: {str(e)}'}) + '\n'
+
+    return StreamingResponse(stream(), media_type='application/x-ndjson')
+
+
+async def get_chart_only(request):
+    try:
+        data = await _json_body(request)
+        birth_date = data['birth_date']
+        birth_time = data['birth_time']
+        birth_place = data['birth_place']
+
+        latitude, longitude, timezone = await geocode_location(birth_place)
+        chart = await get_birth_chart(birth_date, birth_time, latitude, longitude, timezone)
+
+        return JSONResponse({
+            'success': True,
+            'location': {
+                'place': birth_place,
+                'latitude': latitude,
+                'longitude': longitude,
+                'timezone': timezone
+            },
+            'chart': chart
+        })
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+app = Starlette(
+    routes=[
+        Route('/health', health, methods=['GET']),
+        Route('/metrics', metrics, methods=['GET']),
+        Route('/debug-fonts', debug_fonts, methods=['GET']),
+        Route('/debug-chart', debug_chart, methods=['POST']),
+        Route('/generate', generate_book, methods=['POST']),
+        Route('/jobs/{job_id}', get_job, methods=['GET']),
+        Route('/jobs/{job_id}/result', get_job_result, methods=['GET']),
+        Route('/charts/batch', get_charts_batch, methods=['POST']),
+        Route('/chart', get_chart_only, methods=['POST']),
+    ],
+    middleware=[
+        # Same open policy flask_cors.CORS(app) gives the sync app
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
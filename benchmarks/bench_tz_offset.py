@@ -0,0 +1,66 @@
+"""
+Benchmark: historical UTC offset resolution vs. the old fixed offset table
+
+Run from the repo root:
+    python benchmarks/bench_tz_offset.py
+"""
+
+import os
+import random
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tz_offsets import transition_index, utc_offset, utc_offset_for  # noqa: E402
+
+# The table get_tz_offset used before zoneinfo
+LEGACY_OFFSETS = {
+    'Asia/Beirut': '+02:00',
+    'America/New_York': '-05:00',
+    'America/Chicago': '-06:00',
+    'America/Los_Angeles': '-08:00',
+    'Europe/London': '+00:00',
+    'Europe/Paris': '+01:00',
+    'Asia/Dubai': '+04:00',
+    'Asia/Kolkata': '+05:30',
+    'Australia/Sydney': '+11:00',
+    'UTC': '+00:00'
+}
+ZONES = list(LEGACY_OFFSETS)
+N = 100000
+
+
+def main():
+    random.seed(42)
+    samples = []
+    for _ in range(N):
+        local_dt = datetime(random.randint(1950, 2010), random.randint(1, 12), random.randint(1, 28),
+                            random.randint(0, 23), random.randint(0, 59))
+        samples.append((random.choice(ZONES), local_dt, local_dt.strftime('%Y-%m-%d'), local_dt.strftime('%H:%M')))
+
+    # Build every (zone, year) index first so we time the steady state
+    for zone, local_dt, _, _ in samples:
+        transition_index(zone, local_dt.year)
+
+    def legacy():
+        for zone, _, _, _ in samples:
+            LEGACY_OFFSETS.get(zone, '+00:00')
+
+    def indexed():
+        for zone, local_dt, _, _ in samples:
+            utc_offset(zone, local_dt)
+
+    def from_strings():
+        for zone, _, birth_date, birth_time in samples:
+            utc_offset_for(zone, birth_date, birth_time)
+
+    print(f"{N} lookups, {transition_index.cache_info().currsize} (zone, year) indexes")
+    for label, fn in (('legacy dict', legacy), ('zoneinfo index', indexed), ('index + parse', from_strings)):
+        best = min(timeit.repeat(fn, number=1, repeat=5))
+        print(f"{label:>18}: {N / best:>12,.0f} lookups/s  ({best / N * 1e6:.2f} µs each)")
+
+
+if __name__ == "__main__":
+    main()
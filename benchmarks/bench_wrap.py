@@ -0,0 +1,73 @@
+"""
+Benchmark: draw_text line wrapping, old whole-line stringWidth loop vs wrap_lines
+
+Wraps every ZODIAC_DEEP_DATA / MOON_DEEP_DATA text at the widths the book uses
+and checks both produce the same lines.
+
+Run from the repo root:
+    python benchmarks/bench_wrap.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import book_generator  # noqa: E402
+from book_generator import STATIC_TEXTS, wrap_lines  # noqa: E402
+from reportlab.pdfbase import pdfmetrics  # noqa: E402
+
+SIZES = (10, 11, 12)
+WIDTHS = (200, 300, 468)
+
+
+def legacy_wrap(text, font, size, width):
+    """The draw_text loop before memoized widths"""
+    lines = []
+    current_line = ''
+    for word in str(text).split():
+        test_line = current_line + ' ' + word if current_line else word
+        if pdfmetrics.stringWidth(test_line, font, size) < width:
+            current_line = test_line
+        else:
+            lines.append(current_line)
+            current_line = word
+    if current_line:
+        lines.append(current_line)
+    return tuple(lines)
+
+
+def run_all(wrap, font, texts):
+    for text in texts:
+        for size in SIZES:
+            for width in WIDTHS:
+                wrap(text, font, size, width)
+
+
+def main():
+    book_generator.ensure_fonts()
+    font = book_generator.FONT_BODY
+    texts = sorted(STATIC_TEXTS)
+
+    mismatches = sum(
+        legacy_wrap(t, font, s, w) != wrap_lines(t, font, s, w)
+        for t in texts for s in SIZES for w in WIDTHS
+    )
+    print(f"font {font}: {len(texts)} texts x {len(SIZES)} sizes x {len(WIDTHS)} widths, "
+          f"{mismatches} mismatches")
+
+    n = 20
+    legacy = timeit.timeit(lambda: run_all(legacy_wrap, font, texts), number=n) / n
+    cached = timeit.timeit(lambda: run_all(wrap_lines, font, texts), number=n) / n
+    # Dynamic text only gets the word width memo, not the layout cache
+    dynamic = [t + ' ' for t in texts]
+    words_only = timeit.timeit(lambda: run_all(wrap_lines, font, dynamic), number=n) / n
+
+    print(f"legacy stringWidth loop: {legacy * 1000:8.2f} ms per pass")
+    print(f"memoized word widths:    {words_only * 1000:8.2f} ms per pass ({legacy / words_only:.1f}x)")
+    print(f"cached static layouts:   {cached * 1000:8.2f} ms per pass ({legacy / cached:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
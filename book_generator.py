@@ -12,113 +12,58 @@ from reportlab.lib.units import inch
 from reportlab.lib.colors import HexColor, white, black
 from reportlab.pdfgen import canvas
 from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfbase.ttfonts import TTFont, TTFontFace
+from collections import OrderedDict
+import contextlib
+import io
 import math
 import os
-import requests
+import glob
+import hashlib
+import threading
+import time
 import urllib.request
+import zlib
 
 # ==================== FONT SETUP ====================
-def download_font(url, filename):
-    """Download a font file if it doesn't exist"""
-    font_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
-    os.makedirs(font_dir, exist_ok=True)
-    font_path = os.path.join(font_dir, filename)
+# Fonts are provisioned at build time (python book_generator.py --download-fonts)
+# and registered lazily on first use, so importing this module never touches
+# the network or scans the filesystem.
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+
+# Google Fonts URLs for Raleway and EB Garamond
+FONT_URLS = {
+    'Raleway-Regular': 'https://github.com/impallari/Raleway/raw/master/fonts/v4020/Raleway-Regular.ttf',
+    'Raleway-Bold': 'https://github.com/impallari/Raleway/raw/master/fonts/v4020/Raleway-Bold.ttf',
+    'EBGaramond-Regular': 'https://github.com/octaviopardo/EBGaramond12/raw/master/fonts/EBGaramond12-Regular.ttf',
+    'EBGaramond-Bold': 'https://github.com/octaviopardo/EBGaramond12/raw/master/fonts/EBGaramond12-Bold.ttf',
+}
+
+
+def download_font(url, filename, timeout=30):
+    """Download a font file if it doesn't exist (build time only)"""
+    os.makedirs(FONT_DIR, exist_ok=True)
+    font_path = os.path.join(FONT_DIR, filename)
     
     if not os.path.exists(font_path):
         try:
             print(f"📥 Downloading {filename}...")
-            urllib.request.urlretrieve(url, font_path)
+            with urllib.request.urlopen(url, timeout=timeout) as response, open(font_path, 'wb') as f:
+                f.write(response.read())
             print(f"✅ Downloaded {filename}")
         except Exception as e:
+            if os.path.exists(font_path):
+                os.unlink(font_path)
             print(f"⚠️ Could not download {filename}: {e}")
             return None
     return font_path
 
-def setup_fonts():
-    """Setup Raleway and Garamond fonts"""
-    font_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
-    os.makedirs(font_dir, exist_ok=True)
-    
-    fonts = {
-        'heading': None,
-        'heading_bold': None,
-        'body': None,
-        'body_bold': None,
-    }
-    
-    # Google Fonts URLs for Raleway and EB Garamond
-    font_urls = {
-        'Raleway-Regular': 'https://github.com/impallari/Raleway/raw/master/fonts/v4020/Raleway-Regular.ttf',
-        'Raleway-Bold': 'https://github.com/impallari/Raleway/raw/master/fonts/v4020/Raleway-Bold.ttf',
-        'EBGaramond-Regular': 'https://github.com/octaviopardo/EBGaramond12/raw/master/fonts/EBGaramond12-Regular.ttf',
-        'EBGaramond-Bold': 'https://github.com/octaviopardo/EBGaramond12/raw/master/fonts/EBGaramond12-Bold.ttf',
-    }
-    
-    # Try to find or download fonts
-    for font_name, url in font_urls.items():
-        font_path = os.path.join(font_dir, f'{font_name}.ttf')
-        
-        # Check if already exists
-        if os.path.exists(font_path):
-            fonts[font_name] = font_path
-        else:
-            # Try to download
-            downloaded = download_font(url, f'{font_name}.ttf')
-            if downloaded:
-                fonts[font_name] = downloaded
-    
-    return fonts
-
-# Try to setup custom fonts
-CUSTOM_FONTS = setup_fonts()
-
-# Register fonts with ReportLab
-FONT_HEADING = 'Helvetica-Bold'  # Fallback
-FONT_HEADING_BOLD = 'Helvetica-Bold'
-FONT_BODY = 'Helvetica'  # Fallback
-FONT_BODY_BOLD = 'Helvetica-Bold'
-
-# Try to register Garamond for headings
-garamond_path = CUSTOM_FONTS.get('EBGaramond-Regular') if CUSTOM_FONTS else None
-garamond_bold_path = CUSTOM_FONTS.get('EBGaramond-Bold') if CUSTOM_FONTS else None
 
-if garamond_path and os.path.exists(garamond_path):
-    try:
-        pdfmetrics.registerFont(TTFont('Garamond', garamond_path))
-        FONT_HEADING = 'Garamond'
-        print("✅ Garamond font loaded")
-    except Exception as e:
-        print(f"⚠️ Could not load Garamond: {e}")
-
-if garamond_bold_path and os.path.exists(garamond_bold_path):
-    try:
-        pdfmetrics.registerFont(TTFont('Garamond-Bold', garamond_bold_path))
-        FONT_HEADING_BOLD = 'Garamond-Bold'
-    except:
-        FONT_HEADING_BOLD = FONT_HEADING
-
-# Try to register Raleway for body
-raleway_path = CUSTOM_FONTS.get('Raleway-Regular') if CUSTOM_FONTS else None
-raleway_bold_path = CUSTOM_FONTS.get('Raleway-Bold') if CUSTOM_FONTS else None
-
-if raleway_path and os.path.exists(raleway_path):
-    try:
-        pdfmetrics.registerFont(TTFont('Raleway', raleway_path))
-        FONT_BODY = 'Raleway'
-        print("✅ Raleway font loaded")
-    except Exception as e:
-        print(f"⚠️ Could not load Raleway: {e}")
-
-if raleway_bold_path and os.path.exists(raleway_bold_path):
-    try:
-        pdfmetrics.registerFont(TTFont('Raleway-Bold', raleway_bold_path))
-        FONT_BODY_BOLD = 'Raleway-Bold'
-    except:
-        FONT_BODY_BOLD = FONT_BODY
+def provision_fonts():
+    """Build-time step: fetch Raleway and Garamond into fonts/"""
+    return {font_name: download_font(url, f'{font_name}.ttf') for font_name, url in FONT_URLS.items()}
 
-# Fallback to DejaVu if custom fonts failed
-import glob
 
 def find_font(font_name):
     """Find font file path across different systems"""
@@ -147,27 +92,198 @@ def find_font(font_name):
             pass
     return None
 
-# If custom fonts didn't load, try DejaVu as fallback
-if FONT_BODY == 'Helvetica':
-    dejavu_regular = find_font('DejaVuSans.ttf')
-    dejavu_bold = find_font('DejaVuSans-Bold.ttf')
-    
-    if dejavu_regular:
-        try:
-            pdfmetrics.registerFont(TTFont('DejaVuSans', dejavu_regular))
-            FONT_BODY = 'DejaVuSans'
-            print("✅ DejaVuSans font loaded as fallback")
-        except:
-            pass
-    
-    if dejavu_bold:
-        try:
-            pdfmetrics.registerFont(TTFont('DejaVuSans-Bold', dejavu_bold))
-            FONT_BODY_BOLD = 'DejaVuSans-Bold'
-        except:
-            pass
 
-print(f"📝 Using fonts - Heading: {FONT_HEADING}, Body: {FONT_BODY}")
+# Register fonts with ReportLab - these are the fallbacks until ensure_fonts() runs
+FONT_HEADING = 'Helvetica-Bold'  # Fallback
+FONT_HEADING_BOLD = 'Helvetica-Bold'
+FONT_BODY = 'Helvetica'  # Fallback
+FONT_BODY_BOLD = 'Helvetica-Bold'
+
+# Which file each registered font came from (for /debug-fonts)
+FONT_FILES = {}
+_fonts_ready = False
+_fonts_lock = threading.Lock()
+
+
+# Font subsets embedded per book; books mostly share the same few subsets
+FONT_SUBSET_CACHE_SIZE = int(os.environ.get('FONT_SUBSET_CACHE_SIZE', '64'))
+
+# Non-ASCII characters used by the static copy. Every document assigns these
+# first, so subset 0 comes out identical across books and hits the subset cache.
+COMMON_GLYPHS = '\u2014\u2022\u2713'
+
+
+class SubsetCachingFace(TTFontFace):
+    """TTFontFace that remembers built (and compressed) subsets across documents"""
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self._subsets = OrderedDict()
+        self._subsets_lock = threading.Lock()
+        # The parser keeps one read cursor on the face, so subsets are built
+        # one at a time; _subsets_lock stays free for cache hits meanwhile
+        self._build_lock = threading.Lock()
+        self.subset_hits = 0
+        self.subset_misses = 0
+
+    def cached_subset(self, subset):
+        """(raw font program, zlib-compressed font program) for a glyph subset"""
+        key = tuple(subset)
+        with self._subsets_lock:
+            entry = self._subsets.get(key)
+            if entry is not None:
+                self._subsets.move_to_end(key)
+                self.subset_hits += 1
+                return entry
+        with self._build_lock:
+            # Another thread may have built it while we waited
+            with self._subsets_lock:
+                entry = self._subsets.get(key)
+                if entry is not None:
+                    self.subset_hits += 1
+                    return entry
+            raw = TTFontFace.makeSubset(self, subset)
+            entry = (raw, zlib.compress(raw))
+            with self._subsets_lock:
+                self.subset_misses += 1
+                self._subsets[key] = entry
+                while len(self._subsets) > FONT_SUBSET_CACHE_SIZE:
+                    self._subsets.popitem(last=False)
+        return entry
+
+    def makeSubset(self, subset):
+        return self.cached_subset(subset)[0]
+
+    def addSubsetObjects(self, doc, fontname, subset):
+        ref = super().addSubsetObjects(doc, fontname, subset)
+        if doc.compression:
+            # Swap in the pre-compressed program so it isn't deflated again per book
+            font_file = doc.idToObject['fontFile:%s(%s)' % (self.filename, fontname)]
+            font_file.content = self.cached_subset(subset)[1]
+            font_file.dictionary['Filter'] = pdfdoc.PDFArray([pdfdoc.PDFName('FlateDecode')])
+        return ref
+
+
+class CachedTTFont(TTFont):
+    """
+    TTFont built by the stock constructor, then given the process-wide
+    SubsetCachingFace for its file so subsets are cached across books
+    """
+    _faces = {}
+    _faces_lock = threading.Lock()
+
+    def __init__(self, name, filename):
+        super().__init__(name, filename)
+        with CachedTTFont._faces_lock:
+            face = CachedTTFont._faces.get(filename)
+            if face is None:
+                face = CachedTTFont._faces[filename] = SubsetCachingFace(filename)
+        self.face = face
+
+    def prime(self, doc):
+        """Assign the common glyphs in a fixed order for a new document"""
+        chars = ''.join(ch for ch in COMMON_GLYPHS if ord(ch) in self.face.charToGlyph)
+        self.splitString(chars, doc)
+
+
+def _register(name, path):
+    """Register one TTF with ReportLab; returns True on success"""
+    if not path or not os.path.exists(path):
+        return False
+    try:
+        pdfmetrics.registerFont(CachedTTFont(name, path))
+        FONT_FILES[name] = path
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not load {name}: {e}")
+        return False
+
+
+def ensure_fonts():
+    """
+    Register Garamond/Raleway (or DejaVu as fallback) once per process.
+    Cheap after the first call; never downloads anything.
+    """
+    global FONT_HEADING, FONT_HEADING_BOLD, FONT_BODY, FONT_BODY_BOLD, _fonts_ready
+    if _fonts_ready:
+        return
+    with _fonts_lock:
+        if _fonts_ready:
+            return
+        
+        # Try to register Garamond for headings
+        if _register('Garamond', os.path.join(FONT_DIR, 'EBGaramond-Regular.ttf')):
+            FONT_HEADING = 'Garamond'
+            print("✅ Garamond font loaded")
+        if _register('Garamond-Bold', os.path.join(FONT_DIR, 'EBGaramond-Bold.ttf')):
+            FONT_HEADING_BOLD = 'Garamond-Bold'
+        elif FONT_HEADING == 'Garamond':
+            FONT_HEADING_BOLD = FONT_HEADING
+        
+        # Try to register Raleway for body
+        if _register('Raleway', os.path.join(FONT_DIR, 'Raleway-Regular.ttf')):
+            FONT_BODY = 'Raleway'
+            print("✅ Raleway font loaded")
+        if _register('Raleway-Bold', os.path.join(FONT_DIR, 'Raleway-Bold.ttf')):
+            FONT_BODY_BOLD = 'Raleway-Bold'
+        elif FONT_BODY == 'Raleway':
+            FONT_BODY_BOLD = FONT_BODY
+        
+        # If custom fonts didn't load, try DejaVu as fallback
+        if FONT_BODY == 'Helvetica':
+            if _register('DejaVuSans', find_font('DejaVuSans.ttf')):
+                FONT_BODY = 'DejaVuSans'
+                print("✅ DejaVuSans font loaded as fallback")
+            if _register('DejaVuSans-Bold', find_font('DejaVuSans-Bold.ttf')):
+                FONT_BODY_BOLD = 'DejaVuSans-Bold'
+        
+        print(f"📝 Using fonts - Heading: {FONT_HEADING}, Body: {FONT_BODY}")
+        _fonts_ready = True
+
+
+def font_info():
+    """Current font choices and their files"""
+    return {
+        'fonts_ready': _fonts_ready,
+        'font_heading': FONT_HEADING,
+        'font_heading_bold': FONT_HEADING_BOLD,
+        'font_body': FONT_BODY,
+        'font_body_bold': FONT_BODY_BOLD,
+        'font_files': dict(FONT_FILES),
+        'subset_cache': font_cache_stats(),
+        'wrap_cache': wrap_cache_stats(),
+        'page_fragments': page_fragment_stats(),
+    }
+
+
+def font_set():
+    """
+    The fonts books are rendered with in this process, e.g.
+    ('Garamond', 'Garamond-Bold', 'Raleway', 'Raleway-Bold'). Differs when a
+    box falls back to DejaVu/Helvetica, so it belongs in any stored-book key.
+    """
+    ensure_fonts()
+    return (FONT_HEADING, FONT_HEADING_BOLD, FONT_BODY, FONT_BODY_BOLD)
+
+
+def font_cache_stats():
+    """Subset cache counters per embedded font file"""
+    return {
+        os.path.basename(path): {
+            'subsets': len(face._subsets),
+            'hits': face.subset_hits,
+            'misses': face.subset_misses,
+        }
+        for path, face in CachedTTFont._faces.items()
+    }
+
+
+def prime_fonts(canv):
+    """Give a new canvas the shared subset layout for every registered TTF"""
+    for name in FONT_FILES:
+        font = pdfmetrics.getFont(name)
+        if isinstance(font, CachedTTFont):
+            font.prime(canv._doc)
 
 # ==================== BRAND COLORS ====================
 NAVY = HexColor('#1a1f3c')
@@ -440,9 +556,192 @@ def generate_ai_insights(name, sun_sign, moon_sign, rising_sign, quiz_data):
     return get_fallback_insights(name, sun_sign, moon_sign, quiz_data)
 
 
+# ==================== TEXT WRAPPING ====================
+WORD_WIDTH_CACHE_SIZE = int(os.environ.get('WORD_WIDTH_CACHE_SIZE', '20000'))
+
+# (font, size) -> {word: width}
+_word_widths = {}
+# (text, font, size, width) -> lines, only for the static copy below
+_wrap_layouts = {}
+
+
+def _static_texts(*tables):
+    texts = set()
+    for table in tables:
+        for entry in table.values():
+            for value in entry.values():
+                if isinstance(value, str):
+                    texts.add(value)
+                elif isinstance(value, (list, tuple)):
+                    texts.update(v for v in value if isinstance(v, str))
+    return frozenset(texts)
+
+
+STATIC_TEXTS = _static_texts(ZODIAC_DEEP_DATA, MOON_DEEP_DATA)
+
+
+def word_widths(font, size):
+    """Memoized word -> width table for one font and size"""
+    key = (font, size)
+    widths = _word_widths.get(key)
+    if widths is None or len(widths) > WORD_WIDTH_CACHE_SIZE:
+        widths = _word_widths[key] = {}
+    return widths
+
+
+def wrap_lines(text, font, size, width):
+    """
+    Split text into lines narrower than width, same rules as the old
+    draw_text loop but summing memoized word widths instead of re-measuring
+    the whole line for every word.
+    """
+    text = str(text)
+    static = text in STATIC_TEXTS
+    if static:
+        layout_key = (text, font, size, width)
+        lines = _wrap_layouts.get(layout_key)
+        if lines is not None:
+            return lines
+
+    widths = word_widths(font, size)
+    space = widths.get(' ')
+    if space is None:
+        space = widths[' '] = pdfmetrics.stringWidth(' ', font, size)
+
+    lines = []
+    current = []
+    current_width = 0.0
+    for word in text.split():
+        w = widths.get(word)
+        if w is None:
+            w = widths[word] = pdfmetrics.stringWidth(word, font, size)
+        test_width = current_width + space + w if current else w
+        if test_width < width:
+            current.append(word)
+            current_width = test_width
+        else:
+            lines.append(' '.join(current))
+            current = [word]
+            current_width = w
+    if current:
+        lines.append(' '.join(current))
+
+    lines = tuple(lines)
+    if static:
+        _wrap_layouts[layout_key] = lines
+    return lines
+
+
+def wrap_cache_stats():
+    return {
+        'fonts': len(_word_widths),
+        'words': sum(len(w) for w in _word_widths.values()),
+        'layouts': len(_wrap_layouts),
+    }
+
+
+# ==================== STATIC LAYERS ====================
+# Shape-only page furniture (borders, frames, chart wheel, CTA panels) is the
+# same in every book. Each layer is drawn once per worker, its PDF operators
+# kept here, and every document gets it as a single form XObject placed by
+# reference. Bump when the geometry of any layer changes.
+STATIC_LAYER_VERSION = 2
+
+# (name, version, page width, page height) -> form content stream
+_layer_streams = {}
+
+
+def static_layer_stats():
+    return {
+        'version': STATIC_LAYER_VERSION,
+        'layers': sorted(key[0] for key in _layer_streams),
+    }
+
+
+# The CTA page's locked teaser lines; the static overlay draws one blur bar each
+CTA_LOCKED_ITEMS = (
+    "Your Deepest Fear:",
+    "Your Hidden Superpower:",
+    "Your Soulmate's Sun Sign:",
+    "Career You'll Thrive In:",
+    "Your Biggest Relationship Block:",
+    "Best Day for Major Decisions:",
+)
+
+
+# Changes whenever the copy tables do, so stored books and page fragments
+# can be keyed on it
+COPY_FINGERPRINT = hashlib.sha1(repr((
+    ZODIAC_DEEP_DATA, MOON_DEEP_DATA, VENUS_LOVE_STYLES, COMPATIBILITY_DATA,
+)).encode('utf-8')).hexdigest()[:12]
+
+
+# ==================== PAGE FRAGMENTS ====================
+# Most of the sun, moon and love pages depends only on signs. The first book
+# with a given sign keeps that part of the page: its shapes as a form stream
+# (like the static layers) and its text as wrapped, positioned strings. Later
+# books place the form and draw the strings without measuring or wrapping.
+# Text stays strings rather than PDF operators because glyph codes are
+# assigned per document. Keys carry PAGE_TEMPLATE_VERSION (bump when the page
+# code changes), COPY_FINGERPRINT and the font set; clear_page_fragments()
+# drops everything, e.g. after editing the copy tables at runtime.
+PAGE_TEMPLATE_VERSION = 1
+
+# (page, signs, book_type, version, copy, fonts) -> (form stream, fragment, value)
+_page_fragments = {}
+_page_fragments_lock = threading.Lock()
+_page_fragment_counts = {'hits': 0, 'misses': 0}
+
+
+def clear_page_fragments():
+    with _page_fragments_lock:
+        _page_fragments.clear()
+
+
+def page_fragment_stats():
+    with _page_fragments_lock:
+        return {
+            'template_version': PAGE_TEMPLATE_VERSION,
+            'copy_fingerprint': COPY_FINGERPRINT,
+            'fragments': len(_page_fragments),
+            **_page_fragment_counts,
+        }
+
+
+class PageFragment:
+    """The text of a page fragment, drawn over its shapes"""
+
+    def __init__(self):
+        self.texts = []
+
+    def text(self, x, y, text, font, size, color, centered=False):
+        self.texts.append((x, y, text, font, size, color, centered))
+
+    def wrapped(self, text, x, y, width, size=11, line_height=14, color=black, font=None):
+        """Same lines as draw_text; returns the y below the last one"""
+        if not text:
+            return y
+        font = font or FONT_BODY
+        for line in wrap_lines(text, font, size, width):
+            self.text(x, y, line, font, size, color)
+            y -= line_height
+        return y
+
+    def draw(self, c):
+        for x, y, text, font, size, color, centered in self.texts:
+            c.setFillColor(color)
+            c.setFont(font, size)
+            if centered:
+                c.drawCentredString(x, y, text)
+            else:
+                c.drawString(x, y, text)
+
+
 # ==================== MAIN BOOK CLASS ====================
 class OrastriaSampleBookV4:
     def __init__(self, output_path, person_data, quiz_data=None, book_type='sample'):
+        """output_path: a file path, or any writable binary stream (e.g. io.BytesIO)"""
+        ensure_fonts()
         self.output_path = output_path
         self.person = person_data
         self.quiz = quiz_data or {}
@@ -450,6 +749,7 @@ class OrastriaSampleBookV4:
         self.width, self.height = letter
         self.margin = 0.75 * inch
         self.c = canvas.Canvas(output_path, pagesize=letter)
+        prime_fonts(self.c)
         self.page_num = 0
         
         # Get AI insights
@@ -467,8 +767,79 @@ class OrastriaSampleBookV4:
         self.sun_data = ZODIAC_DEEP_DATA.get(self.person.get('sun_sign'), ZODIAC_DEEP_DATA['Aries'])
         self.moon_data = MOON_DEEP_DATA.get(self.person.get('moon_sign'), MOON_DEEP_DATA['Aries'])
     
+    def place_layer(self, name, draw):
+        """
+        Place a static layer as a form XObject. The first document in this
+        worker runs draw() inside beginForm/endForm; later ones reuse its
+        content stream. draw() must only paint shapes (no text or images),
+        since the cached stream carries no font resources.
+        """
+        c = self.c
+        doc = c._doc
+        if not doc.hasForm(name):
+            key = (name, STATIC_LAYER_VERSION, self.width, self.height)
+            stream = _layer_streams.get(key)
+            if stream is None:
+                c.beginForm(name)
+                draw()
+                c.endForm()
+                _layer_streams[key] = doc.idToObject[doc.getXObjectName(name)].stream
+            else:
+                self._add_form(name, stream)
+        c.doForm(name)
+    
+    def _add_form(self, name, stream):
+        """Add a form XObject to this document from a content stream kept earlier"""
+        form = pdfdoc.PDFFormXObject(0, 0, self.width, self.height)
+        form.compression = self.c._pageCompression
+        form.stream = stream
+        self.c._doc.addForm(name, form)
+    
+    def place_fragment(self, page, signs, draw):
+        """
+        Draw the sign-determined part of a page. draw(fragment) paints its
+        shapes on the canvas, adds its text to the fragment and returns a
+        value (e.g. where the personalized text goes), which is returned
+        here. Shapes and text are kept per signs; signs=None (an unknown
+        sign) draws live every time.
+        """
+        c = self.c
+        if signs is None:
+            fragment = PageFragment()
+            value = draw(fragment)
+            fragment.draw(c)
+            return value
+        
+        name = '-'.join((page,) + signs)
+        key = (page, signs, self.book_type, PAGE_TEMPLATE_VERSION, COPY_FINGERPRINT) + font_set()
+        entry = _page_fragments.get(key)
+        if entry is None:
+            fragment = PageFragment()
+            c.beginForm(name)
+            value = draw(fragment)
+            c.endForm()
+            stream = c._doc.idToObject[c._doc.getXObjectName(name)].stream
+            with _page_fragments_lock:
+                _page_fragment_counts['misses'] += 1
+                _page_fragments[key] = (stream, fragment, value)
+        else:
+            stream, fragment, value = entry
+            self._add_form(name, stream)
+            with _page_fragments_lock:
+                _page_fragment_counts['hits'] += 1
+        c.doForm(name)
+        fragment.draw(c)
+        return value
+    
     def draw_border(self):
         """Draw elegant border"""
+        self.place_layer('border', self._border_layer)
+        # A form runs in its own graphics state; restore what the page expects
+        self.c.setStrokeColor(GOLD)
+        self.c.setLineWidth(1)
+        self.c.setFillColor(GOLD)
+    
+    def _border_layer(self):
         c = self.c
         c.setStrokeColor(GOLD)
         c.setLineWidth(1)
@@ -509,24 +880,9 @@ class OrastriaSampleBookV4:
         c.setFillColor(color)
         c.setFont(use_font, size)
         
-        words = str(text).split()
-        if not words:
-            return y
-            
-        current_line = ''
         current_y = y
-        
-        for word in words:
-            test_line = current_line + ' ' + word if current_line else word
-            if c.stringWidth(test_line, use_font, size) < width:
-                current_line = test_line
-            else:
-                c.drawString(x, current_y, current_line)
-                current_y -= line_height
-                current_line = word
-        
-        if current_line:
-            c.drawString(x, current_y, current_line)
+        for line in wrap_lines(text, use_font, size, width):
+            c.drawString(x, current_y, line)
             current_y -= line_height
         
         return current_y
@@ -556,16 +912,9 @@ class OrastriaSampleBookV4:
         """Stunning personalized cover"""
         c = self.c
         
-        # Navy background
-        c.setFillColor(NAVY)
-        c.rect(0, 0, self.width, self.height, fill=1, stroke=0)
-        
-        # Double border
-        c.setStrokeColor(GOLD)
-        c.setLineWidth(2)
-        c.rect(0.4*inch, 0.4*inch, self.width - 0.8*inch, self.height - 0.8*inch)
-        c.setLineWidth(1)
-        c.rect(0.5*inch, 0.5*inch, self.width - 1*inch, self.height - 1*inch)
+        # Background, frame, title rule and sign circles
+        self.place_layer('cover_frame', self._cover_frame_layer)
+        center_y = self.height / 2 - 0.3*inch
         
         # Top decorations (simple text instead of symbols)
         c.setFont(FONT_HEADING_BOLD, 18)
@@ -578,9 +927,6 @@ class OrastriaSampleBookV4:
         c.drawCentredString(self.width/2, self.height - 1.8*inch, "YOUR COSMIC")
         c.drawCentredString(self.width/2, self.height - 2.25*inch, "BLUEPRINT")
         
-        # Line
-        c.line(2.2*inch, self.height - 2.5*inch, self.width - 2.2*inch, self.height - 2.5*inch)
-        
         # Name
         c.setFillColor(white)
         c.setFont(FONT_HEADING_BOLD, 26)
@@ -595,14 +941,6 @@ class OrastriaSampleBookV4:
         c.drawCentredString(self.width/2, self.height - 3.6*inch, f"{birth_date}  •  {birth_time}")
         c.drawCentredString(self.width/2, self.height - 3.85*inch, birth_place)
         
-        # Central circle with sign
-        center_y = self.height / 2 - 0.3*inch
-        c.setStrokeColor(GOLD)
-        c.setLineWidth(2)
-        c.circle(self.width/2, center_y, 85)
-        c.setLineWidth(1)
-        c.circle(self.width/2, center_y, 95)
-        
         # Main zodiac sign (text based)
         sun_sign = self.person.get('sun_sign', 'Aries')
         c.setFont(FONT_HEADING_BOLD, 48)
@@ -627,6 +965,30 @@ class OrastriaSampleBookV4:
         c.setFont(FONT_BODY, 10)
         c.drawCentredString(self.width/2, 1*inch, "Personalized Astrology  •  Written in the Stars")
     
+    def _cover_frame_layer(self):
+        c = self.c
+        
+        # Navy background
+        c.setFillColor(NAVY)
+        c.rect(0, 0, self.width, self.height, fill=1, stroke=0)
+        
+        # Double border
+        c.setStrokeColor(GOLD)
+        c.setLineWidth(2)
+        c.rect(0.4*inch, 0.4*inch, self.width - 0.8*inch, self.height - 0.8*inch)
+        c.setLineWidth(1)
+        c.rect(0.5*inch, 0.5*inch, self.width - 1*inch, self.height - 1*inch)
+        
+        # Line under the title
+        c.line(2.2*inch, self.height - 2.5*inch, self.width - 2.2*inch, self.height - 2.5*inch)
+        
+        # Central circles around the sign
+        center_y = self.height / 2 - 0.3*inch
+        c.setLineWidth(2)
+        c.circle(self.width/2, center_y, 85)
+        c.setLineWidth(1)
+        c.circle(self.width/2, center_y, 95)
+    
     # ==================== PAGE 2: INTRO ====================
     def create_intro_page(self):
         """Emotional hook intro"""
@@ -697,24 +1059,7 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         # Draw wheel
         center_x = self.width / 2
         center_y = self.height / 2 + 0.7*inch
-        
-        c.setStrokeColor(NAVY)
-        c.setLineWidth(2)
-        c.circle(center_x, center_y, 130)
-        c.setLineWidth(1)
-        c.circle(center_x, center_y, 100)
-        c.circle(center_x, center_y, 50)
-        
-        # House lines
-        c.setStrokeColor(HexColor('#cccccc'))
-        c.setLineWidth(0.5)
-        for i in range(12):
-            angle = (90 - i * 30) * math.pi / 180
-            x1 = center_x + 50 * math.cos(angle)
-            y1 = center_y + 50 * math.sin(angle)
-            x2 = center_x + 130 * math.cos(angle)
-            y2 = center_y + 130 * math.sin(angle)
-            c.line(x1, y1, x2, y2)
+        self.place_layer('chart_wheel', self._chart_wheel_layer)
         
         # Signs around wheel (text abbreviations)
         signs = list(ZODIAC_GLYPHS.keys())
@@ -761,6 +1106,29 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
             c.drawString(2.5*inch, y, sign)
             y -= 0.24*inch
     
+    def _chart_wheel_layer(self):
+        c = self.c
+        center_x = self.width / 2
+        center_y = self.height / 2 + 0.7*inch
+        
+        c.setStrokeColor(NAVY)
+        c.setLineWidth(2)
+        c.circle(center_x, center_y, 130)
+        c.setLineWidth(1)
+        c.circle(center_x, center_y, 100)
+        c.circle(center_x, center_y, 50)
+        
+        # House lines
+        c.setStrokeColor(HexColor('#cccccc'))
+        c.setLineWidth(0.5)
+        for i in range(12):
+            angle = (90 - i * 30) * math.pi / 180
+            x1 = center_x + 50 * math.cos(angle)
+            y1 = center_y + 50 * math.sin(angle)
+            x2 = center_x + 130 * math.cos(angle)
+            y2 = center_y + 130 * math.sin(angle)
+            c.line(x1, y1, x2, y2)
+    
     # ==================== PAGE 4: BIG THREE ====================
     def create_big_three_page(self):
         """Big Three overview"""
@@ -830,28 +1198,34 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
     def create_sun_sign_page(self):
         """Sun sign deep dive"""
         self.new_page()
+        
+        sun_sign = self.person.get('sun_sign', 'Unknown')
+        signs = (sun_sign,) if sun_sign in ZODIAC_DEEP_DATA else None
+        box_top = self.place_fragment('sun', signs, self._sun_fragment)
+        
+        ai_sun = self.ai_insights.get('sun_insight', f"Your {sun_sign} nature runs deeper than most realize.")
+        self.draw_text(ai_sun, 1.2*inch, box_top - 0.4*inch, self.width - 2.6*inch, size=10, line_height=13, color=white)
+    
+    def _sun_fragment(self, fragment):
+        """Everything on the sun page but the insight text; returns the insight box top"""
         c = self.c
         
         sun_sign = self.person.get('sun_sign', 'Unknown')
         
-        self.draw_heading(f"Your Sun in {sun_sign}", self.width/2, self.height - 1.3*inch, centered=True)
-        self.draw_subheading("Your core identity and life force", self.width/2, self.height - 1.55*inch, centered=True)
+        fragment.text(self.width/2, self.height - 1.3*inch, f"Your Sun in {sun_sign}", FONT_HEADING_BOLD, 22, NAVY, centered=True)
+        fragment.text(self.width/2, self.height - 1.55*inch, "Your core identity and life force", FONT_BODY, 11, HexColor('#666666'), centered=True)
         
         # Sign circle
         c.setStrokeColor(GOLD)
         c.setLineWidth(2)
         c.circle(self.width/2, self.height - 2.2*inch, 35)
-        c.setFont(FONT_HEADING_BOLD, 24)
-        c.setFillColor(GOLD)
-        c.drawCentredString(self.width/2, self.height - 2.28*inch, sun_sign[:3].upper())
+        fragment.text(self.width/2, self.height - 2.28*inch, sun_sign[:3].upper(), FONT_HEADING_BOLD, 24, GOLD, centered=True)
         
         # Core essence
-        c.setFillColor(NAVY)
-        c.setFont(FONT_HEADING_BOLD, 12)
-        c.drawString(1*inch, self.height - 2.9*inch, "The Truth About Your Core Self")
+        fragment.text(1*inch, self.height - 2.9*inch, "The Truth About Your Core Self", FONT_HEADING_BOLD, 12, NAVY)
         
         essence = self.sun_data.get('core_essence', f"As a {sun_sign} Sun, you possess unique qualities.")
-        y = self.draw_text(essence, 1*inch, self.height - 3.15*inch, self.width - 2*inch, size=10, line_height=14)
+        y = fragment.wrapped(essence, 1*inch, self.height - 3.15*inch, self.width - 2*inch, size=10, line_height=14)
         
         # AI Insight box
         y -= 0.25*inch
@@ -860,12 +1234,7 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         c.setFillColor(NAVY)
         c.roundRect(1*inch, box_top - box_height, self.width - 2*inch, box_height, 8, fill=1, stroke=0)
         
-        c.setFillColor(GOLD)
-        c.setFont(FONT_BODY_BOLD, 9)
-        c.drawString(1.2*inch, box_top - 0.18*inch, "PERSONAL INSIGHT")
-        
-        ai_sun = self.ai_insights.get('sun_insight', f"Your {sun_sign} nature runs deeper than most realize.")
-        self.draw_text(ai_sun, 1.2*inch, box_top - 0.4*inch, self.width - 2.6*inch, size=10, line_height=13, color=white)
+        fragment.text(1.2*inch, box_top - 0.18*inch, "PERSONAL INSIGHT", FONT_BODY_BOLD, 9, GOLD)
         
         # Traits box - FIXED POSITION
         y_traits = 3.6*inch
@@ -874,54 +1243,53 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         c.setStrokeColor(GOLD)
         c.roundRect(1*inch, y_traits - 0.3*inch, self.width - 2*inch, 1.3*inch, 8, fill=0, stroke=1)
         
-        c.setFillColor(NAVY)
-        c.setFont(FONT_HEADING_BOLD, 11)
-        c.drawString(1.2*inch, y_traits + 0.7*inch, f"Core {sun_sign} Traits:")
+        fragment.text(1.2*inch, y_traits + 0.7*inch, f"Core {sun_sign} Traits:", FONT_HEADING_BOLD, 11, NAVY)
         
         traits = self.sun_data.get('core_traits', ['Unique', 'Complex', 'Evolving', 'Authentic', 'Powerful', 'Deep'])
-        c.setFont(FONT_BODY, 10)
-        c.setFillColor(black)
         trait_y = y_traits + 0.4*inch
         for i, trait in enumerate(traits[:3]):
-            c.drawString(1.3*inch, trait_y - i*0.22*inch, f"•  {trait}")
+            fragment.text(1.3*inch, trait_y - i*0.22*inch, f"•  {trait}", FONT_BODY, 10, black)
         for i, trait in enumerate(traits[3:6]):
-            c.drawString(4*inch, trait_y - i*0.22*inch, f"•  {trait}")
+            fragment.text(4*inch, trait_y - i*0.22*inch, f"•  {trait}", FONT_BODY, 10, black)
         
         # Secret wound teaser
-        c.setFillColor(GOLD)
-        c.setFont(FONT_BODY_BOLD, 10)
         wound = self.sun_data.get('secret_wound', 'something deep')[:50]
-        c.drawString(1*inch, 2.2*inch, f"Your secret wound: {wound}...")
-        c.setFont(FONT_BODY, 9)
-        c.setFillColor(HexColor('#888888'))
-        c.drawString(1*inch, 2.0*inch, "[Full shadow work analysis in complete book]")
+        fragment.text(1*inch, 2.2*inch, f"Your secret wound: {wound}...", FONT_BODY_BOLD, 10, GOLD)
+        fragment.text(1*inch, 2.0*inch, "[Full shadow work analysis in complete book]", FONT_BODY, 9, HexColor('#888888'))
+        return box_top
     
     # ==================== PAGE 6: MOON SIGN ====================
     def create_moon_sign_page(self):
         """Moon sign page"""
         self.new_page()
+        
+        moon_sign = self.person.get('moon_sign', 'Unknown')
+        signs = (moon_sign,) if moon_sign in MOON_DEEP_DATA else None
+        box_top = self.place_fragment('moon', signs, self._moon_fragment)
+        
+        ai_moon = self.ai_insights.get('moon_insight', f"Your {moon_sign} Moon shapes how you process everything.")
+        self.draw_text(ai_moon, 1.2*inch, box_top - 0.4*inch, self.width - 2.6*inch, size=10, line_height=13, color=white)
+    
+    def _moon_fragment(self, fragment):
+        """Everything on the moon page but the insight text; returns the insight box top"""
         c = self.c
         
         moon_sign = self.person.get('moon_sign', 'Unknown')
         
-        self.draw_heading(f"Your Moon in {moon_sign}", self.width/2, self.height - 1.3*inch, centered=True)
-        self.draw_subheading("Your emotional nature and inner world", self.width/2, self.height - 1.55*inch, centered=True)
+        fragment.text(self.width/2, self.height - 1.3*inch, f"Your Moon in {moon_sign}", FONT_HEADING_BOLD, 22, NAVY, centered=True)
+        fragment.text(self.width/2, self.height - 1.55*inch, "Your emotional nature and inner world", FONT_BODY, 11, HexColor('#666666'), centered=True)
         
         # Moon circle
         c.setStrokeColor(GOLD)
         c.setLineWidth(2)
         c.circle(self.width/2, self.height - 2.2*inch, 35)
-        c.setFont(FONT_HEADING_BOLD, 24)
-        c.setFillColor(GOLD)
-        c.drawCentredString(self.width/2, self.height - 2.28*inch, moon_sign[:3].upper())
+        fragment.text(self.width/2, self.height - 2.28*inch, moon_sign[:3].upper(), FONT_HEADING_BOLD, 24, GOLD, centered=True)
         
         # Essence
-        c.setFillColor(NAVY)
-        c.setFont(FONT_HEADING_BOLD, 12)
-        c.drawString(1*inch, self.height - 2.9*inch, "Your Emotional Truth")
+        fragment.text(1*inch, self.height - 2.9*inch, "Your Emotional Truth", FONT_HEADING_BOLD, 12, NAVY)
         
         essence = self.moon_data.get('essence', f"With your Moon in {moon_sign}, your emotional world is unique.")
-        y = self.draw_text(essence, 1*inch, self.height - 3.15*inch, self.width - 2*inch, size=10, line_height=14)
+        y = fragment.wrapped(essence, 1*inch, self.height - 3.15*inch, self.width - 2*inch, size=10, line_height=14)
         
         # AI Insight box
         y -= 0.25*inch
@@ -930,12 +1298,7 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         c.setFillColor(NAVY)
         c.roundRect(1*inch, box_top - box_height, self.width - 2*inch, box_height, 8, fill=1, stroke=0)
         
-        c.setFillColor(GOLD)
-        c.setFont(FONT_BODY_BOLD, 9)
-        c.drawString(1.2*inch, box_top - 0.18*inch, "PERSONAL INSIGHT")
-        
-        ai_moon = self.ai_insights.get('moon_insight', f"Your {moon_sign} Moon shapes how you process everything.")
-        self.draw_text(ai_moon, 1.2*inch, box_top - 0.4*inch, self.width - 2.6*inch, size=10, line_height=13, color=white)
+        fragment.text(1.2*inch, box_top - 0.18*inch, "PERSONAL INSIGHT", FONT_BODY_BOLD, 9, GOLD)
         
         # Needs box - FIXED POSITION
         y_needs = 3.6*inch
@@ -944,21 +1307,16 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         c.setStrokeColor(GOLD)
         c.roundRect(1*inch, y_needs - 0.4*inch, self.width - 2*inch, 1.4*inch, 8, fill=0, stroke=1)
         
-        c.setFillColor(NAVY)
-        c.setFont(FONT_HEADING_BOLD, 11)
-        c.drawString(1.2*inch, y_needs + 0.7*inch, f"What Your {moon_sign} Moon Needs:")
+        fragment.text(1.2*inch, y_needs + 0.7*inch, f"What Your {moon_sign} Moon Needs:", FONT_HEADING_BOLD, 11, NAVY)
         
         needs = self.moon_data.get('needs', ['Emotional security', 'Understanding', 'Space to feel', 'Connection'])
-        c.setFont(FONT_BODY, 10)
-        c.setFillColor(black)
         need_y = y_needs + 0.4*inch
         for i, need in enumerate(needs[:4]):
-            c.drawString(1.3*inch, need_y - i*0.24*inch, f"•  {need}")
+            fragment.text(1.3*inch, need_y - i*0.24*inch, f"•  {need}", FONT_BODY, 10, black)
         
         # Teaser
-        c.setFillColor(GOLD)
-        c.setFont(FONT_BODY_BOLD, 10)
-        c.drawString(1*inch, 2.0*inch, "[How your Moon affects your relationships in full book]")
+        fragment.text(1*inch, 2.0*inch, "[How your Moon affects your relationships in full book]", FONT_BODY_BOLD, 10, GOLD)
+        return box_top
     
     # ==================== PAGE 7: QUIZ REFLECTION ====================
     def create_quiz_reflection_page(self):
@@ -1035,10 +1393,18 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
     def create_love_page(self):
         """Love and compatibility"""
         self.new_page()
+        
+        # Nothing on this page is personal beyond the Venus and Sun signs
+        venus = self.person.get('venus', 'Unknown')
+        sun_sign = self.person.get('sun_sign', 'Aries')
+        known = venus in VENUS_LOVE_STYLES and sun_sign in COMPATIBILITY_DATA
+        self.place_fragment('love', (venus, sun_sign) if known else None, self._love_fragment)
+    
+    def _love_fragment(self, fragment):
         c = self.c
         
-        self.draw_heading("Love & Compatibility", self.width/2, self.height - 1.3*inch, centered=True)
-        self.draw_subheading("What the stars reveal about your heart", self.width/2, self.height - 1.55*inch, centered=True)
+        fragment.text(self.width/2, self.height - 1.3*inch, "Love & Compatibility", FONT_HEADING_BOLD, 22, NAVY, centered=True)
+        fragment.text(self.width/2, self.height - 1.55*inch, "What the stars reveal about your heart", FONT_BODY, 11, HexColor('#666666'), centered=True)
         
         # Venus
         venus = self.person.get('venus', 'Unknown')
@@ -1046,22 +1412,16 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         c.setStrokeColor(GOLD)
         c.setLineWidth(2)
         c.circle(self.width/2, self.height - 2.1*inch, 25)
-        c.setFont(FONT_HEADING_BOLD, 16)
-        c.setFillColor(GOLD)
-        c.drawCentredString(self.width/2, self.height - 2.16*inch, "V")
+        fragment.text(self.width/2, self.height - 2.16*inch, "V", FONT_HEADING_BOLD, 16, GOLD, centered=True)
         
-        c.setFillColor(NAVY)
-        c.setFont(FONT_HEADING_BOLD, 13)
-        c.drawCentredString(self.width/2, self.height - 2.5*inch, f"Venus in {venus}")
+        fragment.text(self.width/2, self.height - 2.5*inch, f"Venus in {venus}", FONT_HEADING_BOLD, 13, NAVY, centered=True)
         
         love_style = VENUS_LOVE_STYLES.get(venus, "Your Venus sign shapes how you give and receive love.")
-        y = self.draw_text(love_style, 1*inch, self.height - 2.8*inch, self.width - 2*inch, size=10, line_height=14)
+        y = fragment.wrapped(love_style, 1*inch, self.height - 2.8*inch, self.width - 2*inch, size=10, line_height=14)
         
         # Compatibility section
         y -= 0.25*inch
-        c.setFillColor(NAVY)
-        c.setFont(FONT_HEADING_BOLD, 12)
-        c.drawString(1*inch, y, "Your Top Compatible Signs:")
+        fragment.text(1*inch, y, "Your Top Compatible Signs:", FONT_HEADING_BOLD, 12, NAVY)
         
         sun_sign = self.person.get('sun_sign', 'Aries')
         compatible = COMPATIBILITY_DATA.get(sun_sign, [('Leo', 'Fire Match', 90), ('Sagittarius', 'Adventure', 88), ('Aquarius', 'Unique Bond', 85)])
@@ -1071,13 +1431,8 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
             c.setFillColor(CREAM)
             c.roundRect(1*inch, y - 0.12*inch, self.width - 2*inch, 0.45*inch, 5, fill=1, stroke=0)
             
-            c.setFillColor(NAVY)
-            c.setFont(FONT_BODY_BOLD, 11)
-            c.drawString(1.2*inch, y + 0.05*inch, sign)
-            
-            c.setFont(FONT_BODY, 10)
-            c.setFillColor(HexColor('#666666'))
-            c.drawString(2.8*inch, y + 0.05*inch, match_type)
+            fragment.text(1.2*inch, y + 0.05*inch, sign, FONT_BODY_BOLD, 11, NAVY)
+            fragment.text(2.8*inch, y + 0.05*inch, match_type, FONT_BODY, 10, HexColor('#666666'))
             
             # Score bar
             c.setFillColor(HexColor('#e0e0e0'))
@@ -1085,9 +1440,7 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
             c.setFillColor(GOLD)
             c.rect(4.6*inch, y + 0.05*inch, 1.2*inch * (score/100), 0.15*inch, fill=1, stroke=0)
             
-            c.setFillColor(NAVY)
-            c.setFont(FONT_BODY_BOLD, 9)
-            c.drawString(5.9*inch, y + 0.05*inch, f"{score}%")
+            fragment.text(5.9*inch, y + 0.05*inch, f"{score}%", FONT_BODY_BOLD, 9, NAVY)
             
             y -= 0.55*inch
         
@@ -1095,14 +1448,9 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         c.setFillColor(NAVY)
         c.roundRect(1*inch, 2.0*inch, self.width - 2*inch, 1.0*inch, 10, fill=1, stroke=0)
         
-        c.setFillColor(GOLD)
-        c.setFont(FONT_HEADING_BOLD, 11)
-        c.drawCentredString(self.width/2, 2.75*inch, "In Your Full Book")
-        
-        c.setFillColor(white)
-        c.setFont(FONT_BODY, 10)
-        c.drawCentredString(self.width/2, 2.5*inch, "• Compatibility with ALL 12 signs • Your soulmate's chart signature")
-        c.drawCentredString(self.width/2, 2.28*inch, "• Red flags your chart attracts • How to break your pattern")
+        fragment.text(self.width/2, 2.75*inch, "In Your Full Book", FONT_HEADING_BOLD, 11, GOLD, centered=True)
+        fragment.text(self.width/2, 2.5*inch, "• Compatibility with ALL 12 signs • Your soulmate's chart signature", FONT_BODY, 10, white, centered=True)
+        fragment.text(self.width/2, 2.28*inch, "• Red flags your chart attracts • How to break your pattern", FONT_BODY, 10, white, centered=True)
     
     # ==================== PAGE 9: CAREER ====================
     def create_career_page(self):
@@ -1191,11 +1539,8 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         
         self.draw_heading(f"{first_name}, This Was Just A Glimpse...", self.width/2, self.height - 1.3*inch, size=20, centered=True)
         
-        # Blurred preview section
-        c.setFillColor(HexColor('#f0f0f0'))
-        c.roundRect(1*inch, self.height - 4.0*inch, self.width - 2*inch, 2.3*inch, 10, fill=1, stroke=0)
-        c.setStrokeColor(HexColor('#cccccc'))
-        c.roundRect(1*inch, self.height - 4.0*inch, self.width - 2*inch, 2.3*inch, 10, fill=0, stroke=1)
+        # Preview box and CTA box, under the text
+        self.place_layer('cta_panels', self._cta_panels_layer)
         
         c.setFillColor(NAVY)
         c.setFont(FONT_HEADING_BOLD, 11)
@@ -1204,22 +1549,10 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         # Blurred items
         c.setFont(FONT_BODY, 10)
         c.setFillColor(HexColor('#999999'))
-        locked_items = [
-            "Your Deepest Fear:",
-            "Your Hidden Superpower:",
-            "Your Soulmate's Sun Sign:",
-            "Career You'll Thrive In:",
-            "Your Biggest Relationship Block:",
-            "Best Day for Major Decisions:",
-        ]
-        
         item_y = self.height - 2.2*inch
-        for item in locked_items:
+        for item in CTA_LOCKED_ITEMS:
             c.setFillColor(HexColor('#666666'))
             c.drawString(1.3*inch, item_y, item)
-            # Draw blur bar
-            c.setFillColor(HexColor('#cccccc'))
-            c.rect(3.5*inch, item_y - 0.02*inch, 2.5*inch, 0.18*inch, fill=1, stroke=0)
             item_y -= 0.28*inch
         
         # Features list - FIXED POSITION
@@ -1243,9 +1576,6 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
             feat_y -= 0.24*inch
         
         # CTA box - FIXED POSITION
-        c.setFillColor(NAVY)
-        c.roundRect(1*inch, 1.7*inch, self.width - 2*inch, 1.5*inch, 15, fill=1, stroke=0)
-        
         c.setFillColor(GOLD)
         c.setFont(FONT_HEADING_BOLD, 14)
         c.drawCentredString(self.width/2, 2.95*inch, "Unlock Your Complete Blueprint")
@@ -1258,7 +1588,6 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         c.setFillColor(HexColor('#888888'))
         c.setFont(FONT_BODY, 11)
         c.drawString(self.width/2 - 35, 2.3*inch, "$49.99")
-        c.line(self.width/2 - 40, 2.35*inch, self.width/2, 2.35*inch)
         
         c.setFillColor(GOLD)
         c.setFont(FONT_HEADING_BOLD, 16)
@@ -1267,6 +1596,37 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         c.setFillColor(white)
         c.setFont(FONT_BODY, 9)
         c.drawCentredString(self.width/2, 2.0*inch, "Instant PDF Delivery  •  30-Day Money Back Guarantee")
+        
+        # Blur bars and price strike-through, over the text
+        self.place_layer('cta_overlay', self._cta_overlay_layer)
+    
+    def _cta_panels_layer(self):
+        c = self.c
+        
+        # Blurred preview section
+        c.setFillColor(HexColor('#f0f0f0'))
+        c.roundRect(1*inch, self.height - 4.0*inch, self.width - 2*inch, 2.3*inch, 10, fill=1, stroke=0)
+        c.setStrokeColor(HexColor('#cccccc'))
+        c.roundRect(1*inch, self.height - 4.0*inch, self.width - 2*inch, 2.3*inch, 10, fill=0, stroke=1)
+        
+        # CTA box
+        c.setFillColor(NAVY)
+        c.roundRect(1*inch, 1.7*inch, self.width - 2*inch, 1.5*inch, 15, fill=1, stroke=0)
+    
+    def _cta_overlay_layer(self):
+        c = self.c
+        
+        # Blur bars next to the locked items
+        c.setFillColor(HexColor('#cccccc'))
+        item_y = self.height - 2.2*inch
+        for _ in CTA_LOCKED_ITEMS:
+            c.rect(3.5*inch, item_y - 0.02*inch, 2.5*inch, 0.18*inch, fill=1, stroke=0)
+            item_y -= 0.28*inch
+        
+        # Strike-through on the old price
+        c.setStrokeColor(HexColor('#cccccc'))
+        c.setLineWidth(1)
+        c.line(self.width/2 - 40, 2.35*inch, self.width/2, 2.35*inch)
     
     # ==================== BUILD ====================
     def build(self):
@@ -1285,7 +1645,10 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
         self.create_cta_page()
         
         self.c.save()
-        print(f"✅ Sample book generated: {self.output_path}")
+        if isinstance(self.output_path, (str, os.PathLike)):
+            print(f"✅ Sample book generated: {self.output_path}")
+        else:
+            print("✅ Sample book generated in memory")
         return self.output_path
 
 
@@ -1293,8 +1656,58 @@ What you're about to read may feel uncomfortably accurate. That's by design."""
 OrastriaBookGenerator = OrastriaSampleBookV4
 
 
+def init_render_worker(*_):
+    """
+    Process-pool initializer: make sure every font is registered and its
+    TTF parsed before the first book, not during it
+    """
+    ensure_fonts()
+    for font_name in {FONT_HEADING, FONT_HEADING_BOLD, FONT_BODY, FONT_BODY_BOLD}:
+        pdfmetrics.getFont(font_name)
+    return os.getpid()
+
+
+def render_book(person_data, quiz_data=None, book_type='sample'):
+    """Render a book straight to memory and return the PDF bytes"""
+    buffer = io.BytesIO()
+    OrastriaBookGenerator(buffer, person_data, quiz_data, book_type=book_type).build()
+    return buffer.getvalue()
+
+
+def warm_render_caches():
+    """
+    Render one throwaway book per sun sign so the font subsets, wrap layouts,
+    static layers and page fragments are filled. Run in the gunicorn master
+    with preload_app and every forked worker starts with them copy-on-write.
+    """
+    init_render_worker()
+    signs = list(ZODIAC_DEEP_DATA)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, sign in enumerate(signs):
+            render_book({
+                'name': 'Warm Up',
+                'birth_date': 'January 01, 2000',
+                'birth_time': '12:00 PM',
+                'birth_place': 'London, United Kingdom',
+                'sun_sign': sign,
+                'moon_sign': signs[(i * 5) % len(signs)],
+                'rising_sign': sign,
+                'venus': signs[(i + 1) % len(signs)],
+                'mars': sign,
+                'mercury': sign,
+            })
+    print(f"✅ Render caches warm ({len(signs)} books in {time.perf_counter() - start:.2f}s)")
+
+
 # ==================== TESTING ====================
 if __name__ == "__main__":
+    import sys
+    
+    if '--download-fonts' in sys.argv:
+        provision_fonts()
+        sys.exit(0)
+    
     print("🌟 Testing Orastria Sample Book v4...")
     
     test_person = {
@@ -0,0 +1,329 @@
+"""
+Orastria result caches
+In-memory LRU in front of an optional SQLite store, shared by the
+chart and geocoding lookups so repeat requests skip the upstream APIs.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+CACHE_DIR = os.environ.get(
+    'ORASTRIA_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+)
+
+
+class ResultCache:
+    """
+    Two-level cache: a bounded in-memory LRU backed by SQLite on disk.
+
+    Values must be JSON-serializable. Entries expire after `ttl` seconds in
+    both levels. The disk level is shared by every worker process on the
+    machine, so a chart fetched by one gunicorn worker is a hit for the rest.
+    Pass db_path=None to keep the cache in memory only.
+    """
+
+    def __init__(self, name, max_entries=1024, ttl=86400, db_path=None, max_disk_entries=100000):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_pid = None
+        self._db_lock = threading.Lock()
+        self._writes_since_trim = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.db_path = db_path
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            except OSError as e:
+                print(f"⚠️ {name} cache: disk store unavailable ({e}), using memory only")
+                self.db_path = None
+
+    def _connection(self):
+        """
+        SQLite connection for this process, or None for memory only.
+        Opened lazily and per pid because connections must not cross a fork
+        (gunicorn preload imports app in the master before forking workers).
+        Call with _db_lock held.
+        """
+        if self.db_path is None:
+            return None
+        if self._db is None or self._db_pid != os.getpid():
+            try:
+                db = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute('PRAGMA synchronous=NORMAL')
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS cache ('
+                    'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                    'expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+                )
+                db.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)')
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ {self.name} cache: disk store unavailable ({e}), using memory only")
+                self.db_path = None
+                return None
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    # ---------- memory level ----------
+    def _memory_get(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_set(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    # ---------- disk level ----------
+    def _disk_get(self, key, now):
+        if self.db_path is None:
+            return None
+        try:
+            with self._db_lock:
+                db = self._connection()
+                if db is None:
+                    return None
+                row = db.execute(
+                    'SELECT value, expires_at FROM cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] < now:
+                    db.execute('DELETE FROM cache WHERE key = ?', (key,))
+                    db.commit()
+                    return None
+                db.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+                db.commit()
+            return json.loads(row[0]), row[1]
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️ {self.name} cache read error: {e}")
+            return None
+
+    def _disk_set(self, key, value, expires_at, now):
+        if self.db_path is None:
+            return
+        try:
+            with self._db_lock:
+                db = self._connection()
+                if db is None:
+                    return
+                db.execute(
+                    'INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(value), expires_at, now)
+                )
+                self._writes_since_trim += 1
+                # Trimming needs a COUNT(*), so only do it every so often
+                if self._writes_since_trim >= 100:
+                    self._writes_since_trim = 0
+                    self._trim_disk(db, now)
+                db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"⚠️ {self.name} cache write error: {e}")
+
+    def _trim_disk(self, db, now):
+        db.execute('DELETE FROM cache WHERE expires_at < ?', (now,))
+        count = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            db.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)',
+                (excess,)
+            )
+            self.evictions += excess
+
+    # ---------- public API ----------
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return value
+
+        found = self._disk_get(key, now)
+        if found is not None:
+            value, expires_at = found
+            self._memory_set(key, value, expires_at)
+            with self._lock:
+                self.disk_hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        """Store value under key for `ttl` seconds"""
+        now = time.time()
+        expires_at = now + self.ttl
+        self._memory_set(key, value, expires_at)
+        self._disk_set(key, value, expires_at, now)
+
+    def clear(self):
+        """Drop every entry from both levels"""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            db = self._connection()
+            if db is not None:
+                db.execute('DELETE FROM cache')
+                db.commit()
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+            'memory_entries': len(self._memory),
+            'max_entries': self.max_entries,
+            'evictions': self.evictions,
+            'disk': self.db_path is not None,
+        }
+
+
+class _Flight:
+    """One in-flight SingleFlight call: its result and who wants its progress"""
+
+    def __init__(self):
+        self.future = Future()
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.step = None
+
+    def listen(self, progress):
+        # Under the lock so a late joiner's replay can't land after a newer step
+        with self.lock:
+            self.listeners.append(progress)
+            if self.step is not None:
+                progress(self.step)
+
+    def report(self, step):
+        with self.lock:
+            self.step = step
+            for progress in self.listeners:
+                progress(step)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the
+    function, the rest wait for and share its result (or exception).
+    Per process; pair it with a ResultCache to cover later repeats too.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        return self.do_with_progress(key, lambda progress: fn(*args, **kwargs))
+
+    def do_with_progress(self, key, fn, progress=None):
+        """
+        do() for fn(progress): every caller sharing the run gets its
+        progress steps, one that joins late starting from the latest step
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Flight()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if progress is not None:
+            call.listen(progress)
+        if not leader:
+            return call.future.result()
+
+        try:
+            result = fn(call.report)
+        except BaseException as e:
+            call.future.set_exception(e)
+            raise
+        else:
+            call.future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self):
+        return {
+            'in_flight': len(self._calls),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+        }
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines on one event loop: the first caller's task
+    is shared by the rest, and a caller going away doesn't cancel it.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._tasks = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        task = self._tasks.get(key)
+        if task is None:
+            self.leaders += 1
+            task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {
+            'in_flight': len(self._tasks),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+        }
+
+
+def cache_db_path(filename):
+    """Default on-disk location for a cache, or None if disk caching is disabled"""
+    if os.environ.get('ORASTRIA_DISK_CACHE', '1') == '0':
+        return None
+    return os.path.join(CACHE_DIR, filename)
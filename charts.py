@@ -0,0 +1,183 @@
+"""
+Orastria chart logic
+The parts of getting a birth chart that do no I/O: Prokerala request
+parameters and response parsing, chart cache keys, and which provider
+answers (with its fallback). app.py (requests + threads) and asgi.py
+(httpx + event loop) share these and only add their own I/O around them.
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+
+import ephemeris
+from tz_offsets import utc_offset_for
+
+# ============== PROKERALA ==============
+PROKERALA_PLANET_URL = "https://api.prokerala.com/v2/astrology/planet-position"
+PROKERALA_KUNDLI_URL = "https://api.prokerala.com/v2/astrology/kundli"
+# Overall deadline (seconds) for one chart fetch, retries included
+PROKERALA_DEADLINE = float(os.environ.get('PROKERALA_DEADLINE', 15))
+
+
+def get_tz_offset(timezone, birth_date, birth_time):
+    """Get the UTC offset string like +03:00 in force at the birth moment (DST-aware)"""
+    return utc_offset_for(timezone, birth_date, birth_time)
+
+
+def prokerala_request(birth_date, birth_time, latitude, longitude, timezone):
+    """(datetime_str, query params) for the planet-position and kundli calls"""
+    datetime_str = f"{birth_date}T{birth_time}:00{get_tz_offset(timezone, birth_date, birth_time)}"
+    params = {
+        "ayanamsa": 1,  # Lahiri (required by API)
+        "coordinates": f"{latitude},{longitude}",
+        "datetime": datetime_str
+    }
+    return datetime_str, params
+
+
+def chart_from_prokerala(planet_response, kundli_response, birth_date, birth_time):
+    """
+    Chart dict from the two Prokerala responses (requests or httpx).
+    Raises for a failed planet-position call; a missing or failed kundli
+    only loses the rising sign.
+    """
+    planet_response.raise_for_status()
+    data = planet_response.json()['data']
+
+    # Also get the ascendant/rising sign
+    asc_data = None
+    if kundli_response is not None and 200 <= kundli_response.status_code < 300:
+        asc_data = kundli_response.json()['data']
+
+    return parse_chart_data(data, asc_data, birth_date, birth_time)
+
+
+# ============== CHART CACHE KEYS ==============
+# Bump when parse_chart_data changes so stale charts aren't served
+CHART_CACHE_VERSION = 4
+# Decimal places kept on coordinates (2 = ~1km, far below chart precision)
+CHART_COORD_PRECISION = int(os.environ.get('CHART_COORD_PRECISION', 2))
+
+
+def chart_args(birth_date, birth_time, latitude, longitude, timezone):
+    """Provider arguments with coordinates rounded to CHART_COORD_PRECISION"""
+    return (
+        birth_date, birth_time,
+        round(latitude, CHART_COORD_PRECISION), round(longitude, CHART_COORD_PRECISION),
+        timezone,
+    )
+
+
+def chart_cache_key(birth_date, birth_time, latitude, longitude, timezone, provider='prokerala', ayanamsa=1):
+    """Cache key for a chart: provider, birth moment, rounded coordinates and ayanamsa"""
+    return (
+        f"v{CHART_CACHE_VERSION}|{provider}|{birth_date}T{birth_time}{get_tz_offset(timezone, birth_date, birth_time)}|"
+        f"{latitude:.{CHART_COORD_PRECISION}f},{longitude:.{CHART_COORD_PRECISION}f}|{ayanamsa}"
+    )
+
+
+# ============== PROVIDERS ==============
+CHART_PROVIDER = os.environ.get('CHART_PROVIDER', 'prokerala')
+# Opt-in provider used when the primary fails with a network/API error
+# (e.g. 'local'); unset, a primary outage is returned as an error
+CHART_PROVIDER_FALLBACK = os.environ.get('CHART_PROVIDER_FALLBACK', '')
+
+
+def fallback_provider(provider, error):
+    """The provider to retry with after `provider` failed with `error`, or None to re-raise"""
+    if not CHART_PROVIDER_FALLBACK or CHART_PROVIDER_FALLBACK == provider:
+        return None
+    print(f"⚠️ {provider} chart failed ({error}), using {CHART_PROVIDER_FALLBACK}")
+    return CHART_PROVIDER_FALLBACK
+
+
+# ============== PARSING ==============
+ZODIAC_SIGNS = ephemeris.ZODIAC_SIGNS
+
+# Ayanamsa offset (Lahiri) - approximately 24 degrees in 2024
+# This converts from Sidereal to Tropical. Only used when the birth date is
+# unknown; otherwise birth_ayanamsa gives the value for the actual epoch.
+AYANAMSA = 24.0
+
+# Map Prokerala planet names to our chart keys
+PLANET_NAME_MAP = {
+    'Sun': 'sun_sign',
+    'Moon': 'moon_sign',
+    'Mercury': 'mercury',
+    'Venus': 'venus',
+    'Mars': 'mars',
+    'Jupiter': 'jupiter',
+    'Saturn': 'saturn',
+    'Ascendant': 'rising_sign'
+}
+
+
+def longitude_to_tropical_sign(longitudes, ayanamsa=AYANAMSA):
+    """
+    Convert sidereal longitudes to tropical/Western zodiac signs.
+    Works on a whole array at once and returns a list of sign names.
+    """
+    # Add ayanamsa to convert from sidereal to tropical
+    indexes = ephemeris.sign_indexes(np.asarray(longitudes, dtype=float) + ayanamsa)
+    return [ZODIAC_SIGNS[i] for i in indexes]
+
+
+def birth_ayanamsa(birth_date, birth_time='12:00'):
+    """Lahiri ayanamsa in force at the birth moment (degrees)"""
+    birth_dt = datetime.strptime(f"{birth_date} {birth_time}", "%Y-%m-%d %H:%M")
+    return float(ephemeris.lahiri_ayanamsa(ephemeris.decimal_year(birth_dt)))
+
+
+def parse_chart_data(planet_data, kundli_data, birth_date=None, birth_time='12:00'):
+    """Parse Prokerala response into our format - converts to Western/Tropical zodiac"""
+    
+    ayanamsa = birth_ayanamsa(birth_date, birth_time) if birth_date else AYANAMSA
+    
+    chart = {
+        'sun_sign': 'Unknown',
+        'moon_sign': 'Unknown',
+        'rising_sign': 'Unknown',
+        'mercury': 'Unknown',
+        'venus': 'Unknown',
+        'mars': 'Unknown',
+        'jupiter': 'Unknown',
+        'saturn': 'Unknown'
+    }
+    
+    # Prokerala returns planet_position as a list
+    planets = planet_data.get('planet_position', [])
+    
+    keys = []
+    longitudes = []
+    for planet in planets:
+        key = PLANET_NAME_MAP.get(planet.get('name', ''))
+        if key is None:
+            continue
+        
+        # Get the longitude (absolute position in degrees)
+        longitude = planet.get('longitude', 0)
+        
+        if longitude > 0:
+            # Converted below, all planets in one array operation
+            keys.append(key)
+            longitudes.append(longitude)
+            continue
+        
+        # Fallback to rasi if longitude not available
+        rasi = planet.get('rasi', {})
+        rasi_id = rasi.get('id', -1)
+        if 0 <= rasi_id < 12:
+            # Add ayanamsa offset (roughly 1 sign = ~24 degrees)
+            tropical_rasi_id = (rasi_id + 1) % 12  # Approximate 1 sign offset
+            chart[key] = ZODIAC_SIGNS[tropical_rasi_id]
+        else:
+            chart[key] = 'Unknown'
+    
+    # Convert to tropical/Western signs
+    if longitudes:
+        for key, sign_name in zip(keys, longitude_to_tropical_sign(longitudes, ayanamsa)):
+            chart[key] = sign_name
+    
+    return chart
@@ -0,0 +1,27 @@
+"""
+Orastria CPU budget
+How many CPUs this process may actually use. os.cpu_count() reports host
+cores, which inside a container on a big host can be many times the quota;
+gunicorn.conf.py sizes workers and app.py the render stage from this.
+No third-party imports, so the gunicorn config can load it before any
+gevent monkey-patching.
+"""
+
+import os
+
+
+def available_cpus():
+    """CPUs in this process's affinity mask, capped by a cgroup v2 CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+    # A cgroup v2 CPU quota ("max 100000" = unlimited, "200000 100000" = 2 CPUs)
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
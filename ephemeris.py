@@ -0,0 +1,206 @@
+"""
+Orastria local ephemeris
+Offline tropical longitudes for the Sun, Moon, Mercury-Saturn and the
+ascendant, accurate to well under a degree for 1800-2050 (plenty for
+sign placement). All functions take NumPy arrays so whole batches of
+charts are computed in one pass.
+
+Sources:
+- Planets: Standish, "Keplerian Elements for Approximate Positions of
+  the Major Planets" (JPL), table for 1800-2050
+- Moon: Meeus, Astronomical Algorithms ch. 47, largest longitude terms
+- Sidereal time / obliquity: Meeus ch. 12 and 22
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+
+ZODIAC_SIGNS = [
+    'Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+    'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces'
+]
+
+J2000 = 2451545.0
+_UNIX_EPOCH_JD = 2440587.5
+
+# a (AU), e, I, L, long. perihelion, long. asc. node (deg) and their rates per century
+PLANET_ELEMENTS = {
+    'Mercury': ((0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593),
+                (0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081)),
+    'Venus': ((0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+              (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418)),
+    'Earth': ((1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+              (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0)),
+    'Mars': ((1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+             (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343)),
+    'Jupiter': ((5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+                (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106)),
+    'Saturn': ((9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448),
+               (-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794)),
+}
+
+# Moon longitude terms: (D, M, M', F multipliers, coefficient in 1e-6 degrees)
+MOON_LONGITUDE_TERMS = np.array([
+    (0, 0, 1, 0, 6288774), (2, 0, -1, 0, 1274027), (2, 0, 0, 0, 658314),
+    (0, 0, 2, 0, 213618), (0, 1, 0, 0, -185116), (0, 0, 0, 2, -114332),
+    (2, 0, -2, 0, 58793), (2, -1, -1, 0, 57066), (2, 0, 1, 0, 53322),
+    (2, -1, 0, 0, 45758), (0, 1, -1, 0, -40923), (1, 0, 0, 0, -34720),
+    (0, 1, 1, 0, -30383), (2, 0, 0, -2, 15327), (0, 0, 1, 2, -12528),
+    (0, 0, 1, -2, 10980), (4, 0, -1, 0, 10675), (0, 0, 3, 0, 10034),
+    (4, 0, -2, 0, 8548), (2, 1, -1, 0, -7888), (2, 1, 0, 0, -6766),
+    (1, 0, -1, 0, -5163), (1, 1, 0, 0, 4987), (2, -1, 1, 0, 4036),
+], dtype=float)
+
+# General precession in longitude, degrees per Julian century
+PRECESSION_RATE = 5029.0966 / 3600.0
+
+
+def julian_day(utc_datetimes):
+    """Julian day (UT) for an iterable of aware or naive-UTC datetimes"""
+    stamps = [
+        (dt if dt.tzinfo else dt.replace(tzinfo=dt_timezone.utc)).timestamp()
+        for dt in utc_datetimes
+    ]
+    return np.asarray(stamps, dtype=float) / 86400.0 + _UNIX_EPOCH_JD
+
+
+def _centuries(jd):
+    return (np.asarray(jd, dtype=float) - J2000) / 36525.0
+
+
+def _heliocentric(name, T):
+    """Heliocentric ecliptic x, y, z (J2000) for one planet at centuries T"""
+    base, rate = PLANET_ELEMENTS[name]
+    a, e, inc, L, peri, node = (b + r * T for b, r in zip(base, rate))
+    inc, peri, node = np.radians(inc), np.radians(peri), np.radians(node)
+    omega = peri - node
+    M = np.radians((L - np.degrees(peri) + 180.0) % 360.0 - 180.0)
+
+    # Kepler's equation by Newton iteration
+    E = M + e * np.sin(M)
+    for _ in range(6):
+        E = E - (E - e * np.sin(E) - M) / (1.0 - e * np.cos(E))
+
+    xp = a * (np.cos(E) - e)
+    yp = a * np.sqrt(1.0 - e * e) * np.sin(E)
+
+    cw, sw = np.cos(omega), np.sin(omega)
+    cn, sn = np.cos(node), np.sin(node)
+    ci, si = np.cos(inc), np.sin(inc)
+    x = (cw * cn - sw * sn * ci) * xp + (-sw * cn - cw * sn * ci) * yp
+    y = (cw * sn + sw * cn * ci) * xp + (-sw * sn + cw * cn * ci) * yp
+    z = (sw * si) * xp + (cw * si) * yp
+    return x, y, z
+
+
+def sun_longitude(jd):
+    """Geocentric tropical longitude of the Sun (degrees, equinox of date)"""
+    T = _centuries(jd)
+    x, y, _ = _heliocentric('Earth', T)
+    return (np.degrees(np.arctan2(-y, -x)) + PRECESSION_RATE * T) % 360.0
+
+
+def planet_longitude(name, jd):
+    """Geocentric tropical longitude of a planet (degrees, equinox of date)"""
+    T = _centuries(jd)
+    px, py, _ = _heliocentric(name, T)
+    ex, ey, _ = _heliocentric('Earth', T)
+    return (np.degrees(np.arctan2(py - ey, px - ex)) + PRECESSION_RATE * T) % 360.0
+
+
+def moon_longitude(jd):
+    """Geocentric tropical longitude of the Moon (degrees, equinox of date)"""
+    T = _centuries(jd)
+    mean_longitude = 218.3164477 + 481267.88123421 * T
+    args = np.stack([
+        297.8501921 + 445267.1114034 * T,   # D
+        357.5291092 + 35999.0502909 * T,    # M
+        134.9633964 + 477198.8675055 * T,   # M'
+        93.2720950 + 483202.0175233 * T,    # F
+    ], axis=-1)
+    angles = np.radians(args @ MOON_LONGITUDE_TERMS[:, :4].T)
+    correction = np.sin(angles) @ MOON_LONGITUDE_TERMS[:, 4] * 1e-6
+    return (mean_longitude + correction) % 360.0
+
+
+def ascendant(jd, latitude, longitude):
+    """Tropical longitude of the ascendant for observers at (latitude, east longitude)"""
+    T = _centuries(jd)
+    jd = np.asarray(jd, dtype=float)
+    gmst = 280.46061837 + 360.98564736629 * (jd - J2000) + 0.000387933 * T * T - T ** 3 / 38710000.0
+    ramc = np.radians((gmst + np.asarray(longitude, dtype=float)) % 360.0)
+    eps = np.radians(23.439291 - 0.0130042 * T)
+    phi = np.radians(np.asarray(latitude, dtype=float))
+    asc = np.arctan2(np.cos(ramc), -(np.sin(ramc) * np.cos(eps) + np.tan(phi) * np.sin(eps)))
+    return np.degrees(asc) % 360.0
+
+
+def chart_longitudes(jd, latitude, longitude):
+    """Every longitude a chart needs, as arrays keyed by body name"""
+    longitudes = {
+        'Sun': sun_longitude(jd),
+        'Moon': moon_longitude(jd),
+        'Ascendant': ascendant(jd, latitude, longitude),
+    }
+    for name in ('Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn'):
+        longitudes[name] = planet_longitude(name, jd)
+    return longitudes
+
+
+def sign_indexes(longitudes):
+    """Longitudes in degrees -> sign index 0-11 (Aries = 0)"""
+    return (np.floor_divide(np.asarray(longitudes, dtype=float) % 360.0, 30.0)).astype(int)
+
+
+# ==================== AYANAMSA ====================
+# Lahiri (Chitrapaksha) ayanamsa at J2000, in degrees
+LAHIRI_J2000 = 23.857
+
+
+def lahiri_ayanamsa_exact(decimal_years):
+    """Lahiri ayanamsa from the IAU 2006 precession polynomial (degrees)"""
+    T = (np.asarray(decimal_years, dtype=float) - 2000.0) / 100.0
+    return LAHIRI_J2000 + (5028.796195 * T + 1.1054348 * T * T) / 3600.0
+
+
+# Ayanamsa changes by ~0.014 deg/year almost linearly, so a yearly table
+# with linear interpolation is exact to well under an arcsecond
+AYANAMSA_TABLE_YEARS = np.arange(1800, 2101, dtype=float)
+AYANAMSA_TABLE = lahiri_ayanamsa_exact(AYANAMSA_TABLE_YEARS)
+
+
+def lahiri_ayanamsa(decimal_years):
+    """Lahiri ayanamsa (degrees) for decimal years, interpolated from the yearly table"""
+    return np.interp(decimal_years, AYANAMSA_TABLE_YEARS, AYANAMSA_TABLE)
+
+
+def decimal_year(dt):
+    """datetime -> 1998.68..."""
+    start = datetime(dt.year, 1, 1, tzinfo=dt.tzinfo)
+    end = datetime(dt.year + 1, 1, 1, tzinfo=dt.tzinfo)
+    return dt.year + (dt - start) / (end - start)
+
+
+CHART_KEYS = {
+    'Sun': 'sun_sign', 'Moon': 'moon_sign', 'Ascendant': 'rising_sign',
+    'Mercury': 'mercury', 'Venus': 'venus', 'Mars': 'mars',
+    'Jupiter': 'jupiter', 'Saturn': 'saturn',
+}
+
+
+def compute_charts(utc_datetimes, latitudes, longitudes):
+    """Chart dicts (same keys as parse_chart_data) for many birth moments in one pass"""
+    body_signs = {
+        CHART_KEYS[body]: sign_indexes(values)
+        for body, values in chart_longitudes(julian_day(utc_datetimes), latitudes, longitudes).items()
+    }
+    return [
+        {key: ZODIAC_SIGNS[indexes[i]] for key, indexes in body_signs.items()}
+        for i in range(len(utc_datetimes))
+    ]
+
+
+def compute_chart(utc_datetime, latitude, longitude):
+    """Chart dict (same keys as parse_chart_data) for one birth moment"""
+    return compute_charts([utc_datetime], [latitude], [longitude])[0]
@@ -0,0 +1,224 @@
+"""
+Orastria offline gazetteer
+Resolves common birth places from a local GeoNames dump so most
+geocoding never reaches Nominatim.
+
+Expected files in GAZETTEER_DIR (all from https://download.geonames.org/export/dump/):
+- cities500.txt          (required)
+- countryInfo.txt        (optional, enables "City, Country" matching)
+- admin1CodesASCII.txt   (optional, enables "City, State" matching)
+"""
+
+import bisect
+import os
+import re
+import threading
+import unicodedata
+from array import array
+
+GAZETTEER_DIR = os.environ.get(
+    'GAZETTEER_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'geonames')
+)
+
+# With several cities of the same name, the most populous one is only trusted
+# when it is this many times bigger than the runner-up ("Paris" yes,
+# "Springfield" no); otherwise the name is ambiguous and goes to Nominatim
+GAZETTEER_DOMINANCE = float(os.environ.get('GAZETTEER_DOMINANCE', 10))
+
+_PUNCTUATION = re.compile(r"[^\w\s,]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_place(text):
+    """Lowercase, strip accents and punctuation: 'Zgharta,  Lébanon.' -> 'zgharta, lebanon'"""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = _PUNCTUATION.sub(' ', text.lower())
+    parts = [_WHITESPACE.sub(' ', part).strip() for part in text.split(',')]
+    return ', '.join(part for part in parts if part)
+
+
+class Gazetteer:
+    """
+    Compact in-memory city index.
+
+    Names are kept in one sorted list with a parallel array of row ids, so a
+    lookup is a bisect rather than a dict of ~200k entries. Coordinates and
+    populations live in typed arrays to keep per-city overhead small.
+    """
+
+    def __init__(self, data_dir=GAZETTEER_DIR):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._loaded = False
+        self.available = False
+
+        self._names = []            # sorted normalized names
+        self._name_rows = array('I')  # row id for each entry in _names
+        self._lat = array('d')
+        self._lon = array('d')
+        self._population = array('Q')
+        self._country = []          # ISO code per row
+        self._admin1 = []           # admin1 code per row
+        self._country_names = {}    # normalized name/code -> ISO code
+        self._admin1_names = {}     # (ISO code, normalized name) -> admin1 code
+
+        self.hits = 0
+        self.misses = 0
+        self.ambiguous = 0
+
+    # ---------- loading ----------
+    def load(self):
+        """Load the index once; safe to call from several threads"""
+        if self._loaded:
+            return self.available
+        with self._lock:
+            if self._loaded:
+                return self.available
+            cities_path = os.path.join(self.data_dir, 'cities500.txt')
+            if os.path.exists(cities_path):
+                try:
+                    self._load_countries(os.path.join(self.data_dir, 'countryInfo.txt'))
+                    self._load_admin1(os.path.join(self.data_dir, 'admin1CodesASCII.txt'))
+                    self._load_cities(cities_path)
+                    self.available = True
+                    print(f"✅ Gazetteer loaded: {len(self._lat)} places")
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Could not load gazetteer: {e}")
+            self._loaded = True
+        return self.available
+
+    def _load_countries(self, path):
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                cols = line.rstrip('\n').split('\t')
+                if len(cols) < 5:
+                    continue
+                iso, iso3, name = cols[0], cols[1], cols[4]
+                for alias in (iso, iso3, name):
+                    self._country_names[normalize_place(alias)] = iso
+
+    def _load_admin1(self, path):
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                cols = line.rstrip('\n').split('\t')
+                if len(cols) < 3 or '.' not in cols[0]:
+                    continue
+                country, code = cols[0].split('.', 1)
+                for alias in (code, cols[1], cols[2]):
+                    self._admin1_names[(country, normalize_place(alias))] = code
+
+    def _load_cities(self, path):
+        entries = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                cols = line.rstrip('\n').split('\t')
+                if len(cols) < 15:
+                    continue
+                row = len(self._lat)
+                self._lat.append(float(cols[4]))
+                self._lon.append(float(cols[5]))
+                self._population.append(int(cols[14] or 0))
+                self._country.append(cols[8])
+                self._admin1.append(cols[10])
+                for name in {normalize_place(cols[1]), normalize_place(cols[2])}:
+                    if name:
+                        entries.append((name, row))
+        entries.sort()
+        self._names = [name for name, _ in entries]
+        self._name_rows = array('I', (row for _, row in entries))
+
+    # ---------- lookup ----------
+    def _rows_named(self, name):
+        i = bisect.bisect_left(self._names, name)
+        j = bisect.bisect_right(self._names, name, lo=i)
+        return self._name_rows[i:j]
+
+    def _matches(self, row, qualifier):
+        country = self._country[row]
+        if self._country_names.get(qualifier) == country:
+            return True
+        if qualifier == country.lower():
+            return True
+        return self._admin1_names.get((country, qualifier)) == self._admin1[row]
+
+    def lookup(self, place_name):
+        """
+        Return (lat, lon) for "City" or "City, Region, Country", or None.
+        Every qualifier after the city must match the country or admin1 region.
+        If several cities still match, the most populous wins only when it
+        dominates the rest by GAZETTEER_DOMINANCE; otherwise None, so an
+        ambiguous name is left to Nominatim rather than guessed.
+        """
+        if not self.load():
+            return None
+        parts = normalize_place(place_name).split(', ')
+        city, qualifiers = parts[0], parts[1:]
+
+        rows = sorted(
+            (row for row in self._rows_named(city) if all(self._matches(row, q) for q in qualifiers)),
+            key=lambda row: self._population[row],
+            reverse=True,
+        )
+        if not rows:
+            self._count('misses')
+            return None
+        best = rows[0]
+        if len(rows) > 1 and self._population[best] < GAZETTEER_DOMINANCE * max(self._population[rows[1]], 1):
+            self._count('ambiguous')
+            return None
+        self._count('hits')
+        return self._lat[best], self._lon[best]
+
+    def _count(self, counter):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        return {
+            'available': self.available,
+            'places': len(self._lat),
+            'hits': self.hits,
+            'misses': self.misses,
+            'ambiguous': self.ambiguous,
+        }
+
+
+gazetteer = Gazetteer()
+
+
+# ==================== BUILD-TIME DOWNLOAD ====================
+GEONAMES_BASE_URL = 'https://download.geonames.org/export/dump/'
+
+
+def download_geonames(data_dir=GAZETTEER_DIR):
+    """Fetch the GeoNames files into data_dir (run at build time, never per request)"""
+    import io
+    import urllib.request
+    import zipfile
+
+    os.makedirs(data_dir, exist_ok=True)
+    with urllib.request.urlopen(GEONAMES_BASE_URL + 'cities500.zip', timeout=120) as response:
+        with zipfile.ZipFile(io.BytesIO(response.read())) as archive:
+            archive.extract('cities500.txt', data_dir)
+    for filename in ('countryInfo.txt', 'admin1CodesASCII.txt'):
+        urllib.request.urlretrieve(GEONAMES_BASE_URL + filename, os.path.join(data_dir, filename))
+    print(f"✅ GeoNames data saved to {data_dir}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if '--download' in sys.argv:
+        download_geonames()
+    for query in sys.argv[1:]:
+        if query != '--download':
+            print(f"{query!r} -> {gazetteer.lookup(query)}")
@@ -0,0 +1,114 @@
+"""
+Orastria gunicorn configuration
+Every setting comes from the environment so Railway can tune workers
+without a code change. Start with: gunicorn -c gunicorn.conf.py
+
+With preload_app the master imports app once - fonts registered and parsed,
+TimezoneFinder and the gazetteer loaded, render caches warmed - and forks
+workers that share those pages copy-on-write instead of each rebuilding them.
+"""
+
+import os
+import sys
+
+# gunicorn reads this file before --chdir; the service modules live beside it
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cpus import available_cpus
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+# ============== APP ==============
+# asgi:app needs GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker
+wsgi_app = os.environ.get('GUNICORN_APP', 'app:app')
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+
+# ============== WORKERS ==============
+# gthread: threads share one worker's caches and pools (default)
+# gevent: cooperative I/O for many slow upstream calls; needs gevent installed
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+# Rendering is CPU-bound and holds the GIL, so one process per usable core,
+# capped because every preloaded worker carries its own threads and caches.
+# WEB_CONCURRENCY (or GUNICORN_WORKERS) overrides.
+GUNICORN_MAX_WORKERS = _env_int('GUNICORN_MAX_WORKERS', 8)
+workers = _env_int(
+    'GUNICORN_WORKERS',
+    os.environ.get('WEB_CONCURRENCY', min(available_cpus(), GUNICORN_MAX_WORKERS)),
+)
+# Threads per gthread worker: most of a request is spent waiting on Prokerala/B2
+threads = _env_int('GUNICORN_THREADS', 8)
+# Concurrent greenlets per gevent worker
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 200)
+
+# gevent monkey-patches after the fork, so anything preloaded would keep
+# unpatched locks and sockets; default preload off for it
+preload_app = os.environ.get(
+    'GUNICORN_PRELOAD', '0' if worker_class == 'gevent' else '1'
+) == '1'
+# Render every sign once in the master so workers fork with warm caches
+WARM_RENDER = os.environ.get('GUNICORN_WARM_RENDER', '1') == '1'
+
+# ============== RECYCLING ==============
+# Restart a worker after this many requests to cap slow growth in the
+# per-process caches; jitter keeps workers from restarting together
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# ============== TIMEOUTS ==============
+# A synchronous /generate waits on Prokerala (PROKERALA_DEADLINE) then the
+# render (RENDER_TIMEOUT); allow both plus geocode and upload time
+_generate_budget = (
+    float(os.environ.get('PROKERALA_DEADLINE', 15))
+    + float(os.environ.get('RENDER_TIMEOUT', 90))
+    + 15
+)
+timeout = _env_int('GUNICORN_TIMEOUT', max(120, int(_generate_budget)))
+# On shutdown or recycle let in-flight books and background jobs finish
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', timeout)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+# ============== HOOKS ==============
+def _load_gazetteer(log):
+    """Load cities500 now rather than on the first geocode (takes seconds)"""
+    try:
+        from gazetteer import gazetteer
+        gazetteer.load()
+    except Exception as e:
+        log.warning(f"⚠️ Gazetteer load failed: {e}")
+
+
+def when_ready(server):
+    """Master is up (and has imported the app if preloading)"""
+    if preload_app:
+        _load_gazetteer(server.log)
+    if preload_app and WARM_RENDER:
+        try:
+            import book_generator
+            book_generator.warm_render_caches()
+        except Exception as e:
+            server.log.warning(f"⚠️ Render warm-up failed: {e}")
+    server.log.info(
+        f"✅ gunicorn ready: {workers} x {worker_class}"
+        f"{f' ({threads} threads)' if worker_class == 'gthread' else ''}, "
+        f"preload={'on' if preload_app else 'off'}, timeout={timeout}s"
+    )
+
+
+def post_worker_init(worker):
+    """
+    Load the gazetteer (already inherited when preloading) and start this
+    worker's render process pool before it takes requests
+    """
+    _load_gazetteer(worker.log)
+    try:
+        import render_service
+        render_service.warm_up()
+    except Exception as e:
+        worker.log.warning(f"⚠️ Render pool warm-up failed: {e}")
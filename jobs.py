@@ -0,0 +1,192 @@
+"""
+Orastria background jobs
+Runs book generation off the request thread. Jobs execute on an
+in-process thread pool; their status lives in SQLite so any gunicorn
+worker on the machine can answer a /jobs/<id> poll.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class QueueFullError(Exception):
+    """Raised by JobQueue.submit when the queue is at its depth limit"""
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    Bounded job queue with a fixed number of concurrent runners.
+
+    runner(payload, progress) does the work and returns a JSON-serializable
+    result; progress(step) records a human-readable step name. If runner
+    raises, error_handler(exception) must return (error_payload, status_code).
+    """
+
+    def __init__(self, runner, error_handler, max_workers=2, max_queue=100,
+                 db_path=None, ttl=86400, name='jobs'):
+        self.runner = runner
+        self.error_handler = error_handler
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.ttl = ttl
+        self.name = name
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+
+        self.queued = 0
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+        self.db_path = db_path
+        if db_path:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = None
+        self._db_pid = None
+
+    # ---------- storage ----------
+    def _connection(self):
+        # SQLite connections must not cross a fork, so open one per process
+        if self._db is None or self._db_pid != os.getpid():
+            db = sqlite3.connect(self.db_path or ':memory:', timeout=5, check_same_thread=False)
+            if self.db_path:
+                db.execute('PRAGMA journal_mode=WAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, status TEXT NOT NULL, progress TEXT, '
+                'result TEXT, status_code INTEGER, pid INTEGER, '
+                'created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            db.commit()
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        columns = ', '.join(f'{column} = ?' for column in fields)
+        with self._db_lock:
+            self._connection().execute(f'UPDATE jobs SET {columns} WHERE id = ?', (*fields.values(), job_id))
+            self._connection().commit()
+
+    def _purge_expired(self):
+        with self._db_lock:
+            self._connection().execute('DELETE FROM jobs WHERE updated_at < ?', (time.time() - self.ttl,))
+            self._connection().commit()
+
+    # ---------- execution ----------
+    def _get_executor(self):
+        # A pool created before a fork has no threads in the child, so rebuild per process
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _run(self, job_id, payload):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        self._update(job_id, status=RUNNING)
+
+        def progress(step):
+            self._update(job_id, progress=step)
+
+        try:
+            result = self.runner(payload, progress)
+            self._update(job_id, status=DONE, progress=DONE, result=json.dumps(result), status_code=200)
+            with self._lock:
+                self.completed += 1
+        except Exception as e:
+            error, status_code = self.error_handler(e)
+            self._update(job_id, status=FAILED, progress=FAILED, result=json.dumps(error), status_code=status_code)
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def submit(self, payload):
+        """Queue a job and return its id; raises QueueFullError when saturated"""
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(f'Job queue is full ({self.max_queue} waiting)')
+            self.queued += 1
+            self.submitted += 1
+            should_purge = self.submitted % 100 == 0
+
+        if should_purge:
+            self._purge_expired()
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._db_lock:
+            self._connection().execute(
+                'INSERT INTO jobs (id, status, progress, pid, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, QUEUED, QUEUED, os.getpid(), now, now)
+            )
+            self._connection().commit()
+
+        with self._lock:
+            self._get_executor().submit(self._run, job_id, payload)
+        return job_id
+
+    def get(self, job_id):
+        """Job record as a dict, or None if unknown/expired"""
+        with self._db_lock:
+            row = self._connection().execute(
+                'SELECT id, status, progress, result, status_code, pid, created_at, updated_at '
+                'FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            'job_id': row[0],
+            'status': row[1],
+            'progress': row[2],
+            'result': json.loads(row[3]) if row[3] else None,
+            'status_code': row[4],
+            'created_at': row[6],
+            'updated_at': row[7],
+        }
+        # The worker that owned an unfinished job was recycled or crashed
+        if job['status'] in (QUEUED, RUNNING) and row[5] != os.getpid() and not _pid_alive(row[5]):
+            job.update(status=FAILED, result={'error': 'Worker exited before the job finished'}, status_code=500)
+            self._update(job_id, status=FAILED, result=json.dumps(job['result']), status_code=500)
+        return job
+
+    def stats(self):
+        return {
+            'queue_depth': self.queued,
+            'running': self.running,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+        }
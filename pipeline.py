@@ -0,0 +1,113 @@
+"""
+Orastria generate pipeline
+/generate as a chain of stages (geocode, timezone, chart, render, upload),
+each with its own bounded thread pool and queue. A request thread hands
+every step to the stage's pool and waits for it, so at any moment the
+network-bound stages are busy with some requests while the render stage
+works on others, and each pool can be sized for its own cost.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from upstream import LatencyHistogram
+
+
+class StageFullError(Exception):
+    """Raised when a stage already has max_queue calls waiting"""
+
+
+class Stage:
+    """
+    One pipeline step: `workers` threads, at most `max_queue` calls waiting.
+    workers=0 runs calls inline on the caller's thread (still measured).
+    """
+
+    def __init__(self, name, workers, max_queue):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+        self.queued = 0
+        self.active = 0
+        self.rejected = 0
+        self.wait_histogram = LatencyHistogram()
+        self.run_histogram = LatencyHistogram()
+
+    def _get_executor(self):
+        # Created lazily per process so forked workers don't inherit dead threads
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix=f'stage-{self.name}'
+            )
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _call(self, enqueued_at, fn, args, kwargs):
+        start = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        self.wait_histogram.observe((start - enqueued_at) * 1000)
+        error = True
+        try:
+            result = fn(*args, **kwargs)
+            error = False
+            return result
+        finally:
+            with self._lock:
+                self.active -= 1
+            self.run_histogram.observe((time.perf_counter() - start) * 1000, error=error)
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn on this stage's pool and return its result (or raise its exception)"""
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise StageFullError(f'{self.name} stage is full ({self.max_queue} waiting)')
+            self.queued += 1
+            if self.workers > 0:
+                future = self._get_executor().submit(self._call, time.perf_counter(), fn, args, kwargs)
+        if self.workers <= 0:
+            return self._call(time.perf_counter(), fn, args, kwargs)
+        return future.result()
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'queued': self.queued,
+            'active': self.active,
+            'rejected': self.rejected,
+            'wait': self.wait_histogram.stats(),
+            'run': self.run_histogram.stats(),
+        }
+
+
+class Pipeline:
+    """
+    Named stages configured from the environment:
+    STAGE_<NAME>_WORKERS and STAGE_<NAME>_QUEUE override the defaults.
+    """
+
+    def __init__(self, defaults):
+        self.stages = {}
+        for name, (workers, max_queue) in defaults.items():
+            prefix = f'STAGE_{name.upper()}'
+            self.stages[name] = Stage(
+                name,
+                workers=int(os.environ.get(f'{prefix}_WORKERS', workers)),
+                max_queue=int(os.environ.get(f'{prefix}_QUEUE', max_queue)),
+            )
+
+    def run(self, stage, fn, *args, **kwargs):
+        return self.stages[stage].run(fn, *args, **kwargs)
+
+    def stats(self):
+        return {name: stage.stats() for name, stage in self.stages.items()}
@@ -0,0 +1,100 @@
+"""
+Orastria render service
+Optional process pool for PDF rendering. ReportLab work is CPU-bound pure
+Python, so threads serialize on the GIL; with RENDER_PROCESSES > 0 books
+render in long-lived child processes that already have the fonts
+registered, and throughput scales with cores.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from book_generator import init_render_worker, render_book
+from upstream import LatencyHistogram
+
+# 0 renders inline on the request thread (the old behaviour)
+RENDER_PROCESSES = int(os.environ.get('RENDER_PROCESSES', 0))
+RENDER_TIMEOUT = float(os.environ.get('RENDER_TIMEOUT', 90))
+# forkserver children fork from a server that has book_generator preloaded,
+# which is cheap and avoids forking a multi-threaded gunicorn worker
+RENDER_START_METHOD = os.environ.get(
+    'RENDER_START_METHOD',
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+render_histogram = LatencyHistogram()
+
+
+def _get_pool():
+    """Process pool for this worker, created once and reused for every book"""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                context = multiprocessing.get_context(RENDER_START_METHOD)
+                if RENDER_START_METHOD == 'forkserver':
+                    context.set_forkserver_preload(['book_generator'])
+                _pool = ProcessPoolExecutor(
+                    max_workers=RENDER_PROCESSES,
+                    mp_context=context,
+                    initializer=init_render_worker,
+                )
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def _reset_pool(broken):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def render_pdf(person_data, quiz_data=None, book_type='sample'):
+    """
+    Render a book and return the PDF bytes.
+    person_data/quiz_data must be picklable (plain dicts of strings).
+    """
+    start = time.perf_counter()
+    error = True
+    try:
+        if RENDER_PROCESSES <= 0:
+            pdf_bytes = render_book(person_data, quiz_data, book_type)
+        else:
+            pool = _get_pool()
+            try:
+                pdf_bytes = pool.submit(render_book, person_data, quiz_data, book_type).result(timeout=RENDER_TIMEOUT)
+            except BrokenProcessPool:
+                # A child died (OOM, segfault); start a fresh pool and retry once
+                print("⚠️ Render pool broken, restarting")
+                _reset_pool(pool)
+                pdf_bytes = _get_pool().submit(render_book, person_data, quiz_data, book_type).result(timeout=RENDER_TIMEOUT)
+        error = False
+        return pdf_bytes
+    finally:
+        render_histogram.observe((time.perf_counter() - start) * 1000, error=error)
+
+
+def warm_up():
+    """Start every render process now so the first book doesn't wait for them"""
+    if RENDER_PROCESSES <= 0:
+        return
+    pool = _get_pool()
+    list(pool.map(init_render_worker, range(RENDER_PROCESSES)))
+    print(f"✅ Render pool ready ({RENDER_PROCESSES} processes, {RENDER_START_METHOD})")
+
+
+def stats():
+    return {
+        'processes': RENDER_PROCESSES,
+        'start_method': RENDER_START_METHOD if RENDER_PROCESSES > 0 else 'inline',
+        **render_histogram.stats(),
+    }
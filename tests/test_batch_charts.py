@@ -0,0 +1,36 @@
+import threading
+
+import app
+
+PLACES = {'fast town': (51.5, -0.12, 'Europe/London'), 'slow town': (40.71, -74.0, 'America/New_York')}
+
+
+def test_results_stream_before_every_place_is_geocoded(monkeypatch):
+    slow_place_may_finish = threading.Event()
+
+    def geocode(place):
+        if place == 'Slow Town':
+            assert slow_place_may_finish.wait(5)
+        return PLACES[place.lower()]
+
+    monkeypatch.setattr(app, 'geocode_location', geocode)
+    monkeypatch.setattr(app, 'CHART_PROVIDER', 'local')
+    monkeypatch.setattr(app.chart_cache, 'get', lambda key: None)
+    monkeypatch.setattr(app.chart_cache, 'set', lambda key, value: None)
+
+    records = [
+        {'birth_date': '1990-01-01', 'birth_time': '08:00', 'birth_place': 'Slow Town'},
+        {'birth_date': '1990-01-01', 'birth_time': '08:00', 'birth_place': 'Fast Town'},
+        {'birth_date': '1991-05-05', 'birth_time': '12:00', 'birth_place': 'Fast Town'},
+        {'birth_date': '1990-01-01', 'birth_time': '08:00'},
+    ]
+    results = app.get_birth_charts(records)
+
+    first = dict([next(results), next(results), next(results)])
+    assert set(first) == {1, 2, 3}
+    assert first[3] == {'error': 'Missing required field: birth_place'}
+    assert first[1]['location']['latitude'] == 51.5
+
+    slow_place_may_finish.set()
+    index, last = next(results)
+    assert index == 0 and last['chart']['provider'] == 'local'
@@ -0,0 +1,24 @@
+import threading
+
+import book_generator
+from reportlab.pdfbase.ttfonts import TTFontFace
+
+
+def test_concurrent_misses_build_each_subset_once():
+    path = book_generator.find_font('DejaVuSans.ttf')
+    face = book_generator.SubsetCachingFace(path)
+    subsets = [[0] + list(range(32 + i, 72 + i)) for i in range(8)]
+    expected = [TTFontFace(path).makeSubset(subset) for subset in subsets]
+    results = []
+
+    def build():
+        results.append([face.makeSubset(subset) for subset in subsets])
+
+    threads = [threading.Thread(target=build) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [expected] * 6
+    assert face.subset_misses == len(subsets)
@@ -0,0 +1,46 @@
+from gazetteer import Gazetteer
+
+
+def city_row(geonameid, name, lat, lon, country, admin1, population):
+    cols = [''] * 19
+    cols[0], cols[1], cols[2] = str(geonameid), name, name
+    cols[4], cols[5] = str(lat), str(lon)
+    cols[8], cols[10], cols[14] = country, admin1, str(population)
+    return '\t'.join(cols) + '\n'
+
+
+def make_gazetteer(tmp_path):
+    (tmp_path / 'cities500.txt').write_text(''.join([
+        city_row(1, 'Springfield', 39.80, -89.64, 'US', 'IL', 116250),
+        city_row(2, 'Springfield', 37.21, -93.29, 'US', 'MO', 166810),
+        city_row(3, 'Springfield', 42.10, -72.59, 'US', 'MA', 153703),
+        city_row(4, 'Paris', 48.85, 2.35, 'FR', '11', 2138551),
+        city_row(5, 'Paris', 33.66, -95.56, 'US', 'TX', 24782),
+        city_row(6, 'Zgharta', 34.40, 35.89, 'LB', '09', 35000),
+    ]), encoding='utf-8')
+    (tmp_path / 'admin1CodesASCII.txt').write_text(
+        'US.IL\tIllinois\tIllinois\t4896861\n'
+        'US.MO\tMissouri\tMissouri\t4398678\n'
+        'US.MA\tMassachusetts\tMassachusetts\t6254928\n',
+        encoding='utf-8',
+    )
+    return Gazetteer(str(tmp_path))
+
+
+def test_ambiguous_name_is_left_to_nominatim(tmp_path):
+    gazetteer = make_gazetteer(tmp_path)
+    assert gazetteer.lookup('Springfield') is None
+    assert gazetteer.lookup('Springfield, US') is None
+    assert gazetteer.stats()['ambiguous'] == 2
+
+
+def test_qualifier_resolves_ambiguous_name(tmp_path):
+    gazetteer = make_gazetteer(tmp_path)
+    assert gazetteer.lookup('Springfield, Illinois') == (39.80, -89.64)
+
+
+def test_dominant_city_wins_without_qualifier(tmp_path):
+    gazetteer = make_gazetteer(tmp_path)
+    assert gazetteer.lookup('paris') == (48.85, 2.35)
+    assert gazetteer.lookup('Zgharta') == (34.40, 35.89)
+    assert gazetteer.lookup('Atlantis') is None
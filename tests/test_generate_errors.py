@@ -0,0 +1,15 @@
+import pytest
+from starlette.testclient import TestClient
+
+import app
+import asgi
+
+
+@pytest.mark.parametrize('body', ['{not json', 'null', '[1, 2]'])
+def test_bad_generate_body_is_400_in_both_apps(body):
+    headers = {'Content-Type': 'application/json'}
+    flask_response = app.app.test_client().post('/generate', data=body, headers=headers)
+    asgi_response = TestClient(asgi.app).post('/generate', content=body, headers=headers)
+
+    assert flask_response.status_code == asgi_response.status_code == 400
+    assert flask_response.get_json() == asgi_response.json()
@@ -0,0 +1,37 @@
+import sys
+import threading
+
+import app
+from cache import ResultCache
+
+
+def _hammer(target, threads=8, calls=2000):
+    def run():
+        for _ in range(calls):
+            target()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * calls
+
+
+def test_book_store_counts_are_exact_under_threads(monkeypatch):
+    monkeypatch.setitem(app.book_store_counts, 'reused', 0)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        total = _hammer(lambda: app.count_book_store('reused'))
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert app.book_store_stats()['reused'] == total
+
+
+def test_cache_misses_are_exact_under_threads():
+    cache = ResultCache('counters', max_entries=8)
+    total = _hammer(lambda: cache.get('absent'))
+
+    assert cache.stats()['misses'] == total
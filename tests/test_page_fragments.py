@@ -0,0 +1,31 @@
+import contextlib
+import io
+
+import book_generator
+
+PERSON = {'name': 'Jane Doe', 'sun_sign': 'Leo', 'moon_sign': 'Pisces', 'venus': 'Virgo'}
+
+
+def render(person):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return book_generator.render_book(person)
+
+
+def test_second_book_reuses_sign_fragments():
+    book_generator.clear_page_fragments()
+    render(PERSON)
+    before = book_generator.page_fragment_stats()
+    assert before['fragments'] == 3
+
+    pdf = render(PERSON)
+    after = book_generator.page_fragment_stats()
+    assert after['fragments'] == 3
+    assert after['hits'] - before['hits'] == 3
+    assert pdf.count(b'/Subtype /Form') >= 3
+
+
+def test_unknown_sign_is_drawn_live():
+    book_generator.clear_page_fragments()
+    render(dict(PERSON, sun_sign='Ophiuchus'))
+    # The sun and love pages depend on the unknown sign; only the moon page is kept
+    assert book_generator.page_fragment_stats()['fragments'] == 1
@@ -0,0 +1,31 @@
+import threading
+import time
+
+import app
+
+
+def test_concurrent_401s_refresh_once(monkeypatch):
+    manager = app.ProkeralaTokenManager(refresh_margin=0)
+    fetched = []
+
+    def fetch(deadline=None):
+        time.sleep(0.05)
+        fetched.append(1)
+        return f'token-{len(fetched)}', time.monotonic() + 3600
+
+    monkeypatch.setattr(manager, '_fetch', fetch)
+    stale = manager.get_token()
+    results = []
+
+    def on_401():
+        manager.invalidate(stale)
+        results.append(manager.get_token())
+
+    threads = [threading.Thread(target=on_401) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['token-2'] * 8
+    assert manager.stats()['refreshes'] == 2
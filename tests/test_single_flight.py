@@ -0,0 +1,42 @@
+import threading
+
+from cache import SingleFlight
+
+
+def test_joiner_gets_progress_from_the_latest_step():
+    flight = SingleFlight('progress')
+    joined = threading.Event()
+    leader_steps, joiner_steps, results = [], [], []
+
+    def run(progress):
+        progress('geocoding')
+        progress('chart')
+        joined.wait(5)
+        progress('rendering')
+        return 'book'
+
+    leader = threading.Thread(target=lambda: results.append(flight.do_with_progress('k', run, leader_steps.append)))
+    leader.start()
+    while flight._calls.get('k') is None or flight._calls['k'].step != 'chart':
+        pass
+
+    def join():
+        results.append(flight.do_with_progress('k', run, joiner_steps.append))
+
+    joiner = threading.Thread(target=join)
+    joiner.start()
+    while len(flight._calls['k'].listeners) < 2:
+        pass
+    joined.set()
+    leader.join()
+    joiner.join()
+
+    assert results == ['book', 'book']
+    assert leader_steps == ['geocoding', 'chart', 'rendering']
+    assert joiner_steps == ['chart', 'rendering']
+    assert flight.stats() == {'in_flight': 0, 'leaders': 1, 'coalesced': 1}
+
+
+def test_do_still_shares_one_result():
+    flight = SingleFlight('plain')
+    assert flight.do('k', lambda a, b=0: a + b, 1, b=2) == 3
@@ -0,0 +1,41 @@
+from urllib.parse import unquote
+
+import app
+
+CHART = {'sun_sign': 'Leo', 'moon_sign': 'Aries', 'rising_sign': 'Leo', 'provider': 'local'}
+
+
+def headers_for(name, upload=False):
+    data = {'name': name, 'upload': upload}
+    return app.stream_headers(data, {'name': name}, CHART, b'%PDF', 'sample')
+
+
+def test_non_latin1_name_gives_latin1_headers(monkeypatch):
+    monkeypatch.setattr(app.background_uploads, 'submit', lambda *args: None)
+    headers = headers_for('李小龍', upload=True)
+    for value in headers.values():
+        value.encode('latin-1')
+
+    disposition = headers['Content-Disposition']
+    assert disposition.startswith('inline; filename="')
+    assert unquote(disposition.split("filename*=UTF-8''", 1)[1]).startswith('李小龍_')
+    assert headers['X-Upload-Status'] == 'pending'
+
+
+def test_quote_in_name_does_not_break_quoting():
+    disposition = headers_for('Jane "JJ" Doe')['Content-Disposition']
+    ascii_part = disposition.split('; ')[1]
+    assert ascii_part.count('"') == 2
+    assert 'X-Download-Url' not in headers_for('Jane')
+
+
+def test_streamed_generate_with_non_latin1_name(monkeypatch):
+    monkeypatch.setattr(app, 'prepare_person', lambda data: ({'name': data['name']}, CHART))
+    monkeypatch.setattr(app.render_service, 'render_pdf', lambda person_data, book_type: b'%PDF-1.4 test')
+    response = app.app.test_client().post('/generate', json={
+        'name': '李小龍', 'birth_date': '1940-11-27', 'birth_time': '07:00',
+        'birth_place': 'San Francisco', 'stream': True,
+    })
+    assert response.status_code == 200
+    assert response.data == b'%PDF-1.4 test'
+    response.headers['Content-Disposition'].encode('latin-1')
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import pytest
+
+from tz_offsets import parse_local, to_utc, utc_offset_for
+
+
+def test_parse_local_matches_strptime():
+    assert parse_local('1998-09-06', '18:30') == datetime(1998, 9, 6, 18, 30)
+    # Unpadded input still parses, through strptime
+    assert parse_local('1998-9-6', '8:30') == datetime(1998, 9, 6, 8, 30)
+
+
+@pytest.mark.parametrize('birth_date, birth_time', [
+    ('1998-02-30', '18:30'),
+    ('1998-09-06', '18:3x'),
+    ('1998-09-06', '18:30:15'),
+])
+def test_parse_local_rejects_what_strptime_rejects(birth_date, birth_time):
+    with pytest.raises(ValueError):
+        parse_local(birth_date, birth_time)
+
+
+def test_offsets_follow_dst():
+    assert utc_offset_for('America/New_York', '1998-07-01', '12:00') == '-04:00'
+    assert utc_offset_for('America/New_York', '1998-01-01', '12:00') == '-05:00'
+    assert to_utc('Asia/Kolkata', '2000-01-01', '05:30') == datetime(2000, 1, 1, 0, 0)
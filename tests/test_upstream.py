@@ -0,0 +1,80 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import upstream
+
+
+class Handler(BaseHTTPRequestHandler):
+    calls = 0
+
+    def do_GET(self):
+        Handler.calls += 1
+        if self.path == '/slow':
+            time.sleep(1)
+        self.send_response(429 if self.path == '/busy' else 503)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    Handler.calls = 0
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+
+
+def test_retries_without_deadline(server, monkeypatch):
+    monkeypatch.setattr(upstream, 'UPSTREAM_BACKOFF', 0.01)
+    session = upstream.UpstreamSession('test', retries=2)
+    assert session.get(server + '/').status_code == 503
+    assert Handler.calls == 3
+
+
+def test_no_retry_once_backoff_would_pass_deadline(server, monkeypatch):
+    monkeypatch.setattr(upstream, 'UPSTREAM_BACKOFF', 1)
+    session = upstream.UpstreamSession('test', retries=2)
+    start = time.monotonic()
+    response = session.get(server + '/', deadline=start + 0.3)
+    assert response.status_code == 503
+    assert Handler.calls == 1
+    assert time.monotonic() - start < 0.3
+
+
+def test_attempt_timeout_capped_to_deadline(server):
+    session = upstream.UpstreamSession('test', retries=2)
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        session.get(server + '/slow', deadline=start + 0.3)
+    assert time.monotonic() - start < 0.6
+
+
+def test_status_outside_retry_statuses_is_returned(server):
+    session = upstream.UpstreamSession('test', retry_statuses=(503,))
+    assert session.get(server + '/busy').status_code == 429
+    assert Handler.calls == 1
+
+
+def test_rate_limited_attempts_are_spaced(server, monkeypatch):
+    monkeypatch.setattr(upstream, 'UPSTREAM_BACKOFF', 0)
+    session = upstream.UpstreamSession('test', retries=2, min_interval=0.1)
+    start = time.monotonic()
+    session.get(server + '/')
+    assert Handler.calls == 3
+    assert time.monotonic() - start >= 0.2
+
+
+def test_rate_limiter_books_consecutive_slots():
+    limiter = upstream.RateLimiter(1.0)
+    delays = [limiter.reserve() for _ in range(3)]
+    assert delays[0] == 0
+    assert delays[1] == pytest.approx(1.0, abs=0.05)
+    assert delays[2] == pytest.approx(2.0, abs=0.05)
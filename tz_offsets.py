@@ -0,0 +1,117 @@
+"""
+Orastria UTC offset resolution
+Historical offsets (including DST) for a local birth time, using the IANA
+database through zoneinfo. Transitions are indexed once per (zone, year)
+so each lookup after that is a bisect.
+"""
+
+import bisect
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+_DAY = timedelta(days=1)
+
+
+def format_offset(offset):
+    """timedelta -> '+05:30' (rounded to the minute, as Prokerala expects)"""
+    minutes = round(offset.total_seconds() / 60)
+    sign = '+' if minutes >= 0 else '-'
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+def _local_seconds(dt):
+    """Naive wall-clock datetime -> seconds since 1970-01-01 on the same wall clock"""
+    return (dt.toordinal() - _EPOCH_ORDINAL) * 86400 + dt.hour * 3600 + dt.minute * 60 + dt.second
+
+
+def parse_local(birth_date, birth_time):
+    """
+    ("1998-09-06", "18:30") -> naive datetime. The usual zero-padded form
+    goes through fromisoformat (strptime alone costs several times the
+    offset lookup); anything else through strptime, which also rejects bad
+    input.
+    """
+    if len(birth_date) == 10 and len(birth_time) == 5:
+        try:
+            return datetime.fromisoformat(f"{birth_date}T{birth_time}")
+        except ValueError:
+            pass
+    return datetime.strptime(f"{birth_date} {birth_time}", "%Y-%m-%d %H:%M")
+
+
+def _find_transition(zone, lo, hi):
+    """First whole UTC minute in (lo, hi] where the offset differs from lo's"""
+    before = lo.astimezone(zone).utcoffset()
+    lo_min, hi_min = 0, (hi - lo) // timedelta(minutes=1)
+    while hi_min - lo_min > 1:
+        mid = (lo_min + hi_min) // 2
+        if (lo + timedelta(minutes=mid)).astimezone(zone).utcoffset() == before:
+            lo_min = mid
+        else:
+            hi_min = mid
+    return lo + timedelta(minutes=hi_min)
+
+
+@lru_cache(maxsize=4096)
+def transition_index(zone_name, year):
+    """
+    Offsets in force during one local calendar year, as two parallel lists:
+    wall-clock start times (local seconds) and their '+HH:MM' strings.
+
+    Wall times inside a DST gap or fold resolve like zoneinfo's fold=0,
+    i.e. to the offset in force before the transition.
+    """
+    zone = ZoneInfo(zone_name)
+    # Scan a little past both ends so transitions near New Year are caught
+    instant = datetime(year, 1, 1, tzinfo=dt_timezone.utc) - 2 * _DAY
+    end = datetime(year + 1, 1, 1, tzinfo=dt_timezone.utc) + 2 * _DAY
+
+    offset = instant.astimezone(zone).utcoffset()
+    starts = [float('-inf')]
+    offsets = [format_offset(offset)]
+    while instant < end:
+        following = instant + _DAY
+        next_offset = following.astimezone(zone).utcoffset()
+        if next_offset != offset:
+            changed_at = _find_transition(zone, instant, following)
+            # First wall time that unambiguously uses the new offset
+            wall = changed_at.replace(tzinfo=None) + max(offset, next_offset)
+            starts.append(_local_seconds(wall))
+            offsets.append(format_offset(next_offset))
+            offset = next_offset
+        instant = following
+    return starts, offsets
+
+
+def utc_offset(zone_name, local_dt):
+    """UTC offset string in force in zone_name at naive local datetime local_dt"""
+    starts, offsets = transition_index(zone_name, local_dt.year)
+    return offsets[bisect.bisect_right(starts, _local_seconds(local_dt)) - 1]
+
+
+def utc_offset_for(zone_name, birth_date, birth_time):
+    """
+    utc_offset for request-style strings: ("Asia/Beirut", "1998-09-06", "18:30").
+    Unknown zones fall back to +00:00 like the old offset table did.
+    """
+    return _offset_or_utc(zone_name, parse_local(birth_date, birth_time))
+
+
+def _offset_or_utc(zone_name, local_dt):
+    try:
+        return utc_offset(zone_name, local_dt)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        print(f"⚠️ Unknown timezone {zone_name!r}: {e}")
+        return '+00:00'
+
+
+def to_utc(zone_name, birth_date, birth_time):
+    """Naive UTC datetime for a local birth moment, using the same offset sent to Prokerala"""
+    local_dt = parse_local(birth_date, birth_time)
+    offset = _offset_or_utc(zone_name, local_dt)
+    sign = -1 if offset[0] == '-' else 1
+    hours, minutes = offset[1:].split(':')
+    return local_dt - sign * timedelta(hours=int(hours), minutes=int(minutes))
@@ -0,0 +1,207 @@
+"""
+Orastria upstream HTTP clients
+One pooled requests.Session per upstream service, with explicit
+connect/read timeouts, jittered retries on 429/5xx (bounded by an optional
+deadline), an optional per-process rate limit and a latency histogram per
+upstream for /metrics. The retry policy (statuses, methods, retry_delay)
+and the rate limiter are shared with the async clients in asgi.py.
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 3.05))
+UPSTREAM_READ_TIMEOUT = float(os.environ.get('UPSTREAM_READ_TIMEOUT', 10))
+UPSTREAM_RETRIES = int(os.environ.get('UPSTREAM_RETRIES', 2))
+UPSTREAM_BACKOFF = float(os.environ.get('UPSTREAM_BACKOFF', 0.3))
+UPSTREAM_POOL_SIZE = int(os.environ.get('UPSTREAM_POOL_SIZE', 16))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def retry_delay(retry_number):
+    """
+    Seconds to sleep before retry number `retry_number` (1, 2, ...):
+    jittered exponential backoff. A server's Retry-After is deliberately
+    ignored - it can ask for minutes while a request thread waits.
+    """
+    return UPSTREAM_BACKOFF * (2 ** (retry_number - 1)) * random.uniform(0.5, 1.5)
+
+
+def is_connect_error(error):
+    """True if the request never reached the server (safe to retry for any method)"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+def attempt_timeout(timeout, deadline):
+    """
+    (connect, read) timeout for one attempt, capped to what is left of
+    `deadline` (a time.monotonic() value, or None for no deadline)
+    """
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    if deadline is None:
+        return connect, read
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise requests.Timeout("Deadline passed before the request started")
+    return min(connect, remaining), min(read, remaining)
+
+
+class RateLimiter:
+    """
+    Spaces calls to one upstream at least `interval` seconds apart across
+    every thread in the process. reserve() books the next free slot and
+    returns how long to wait for it, so threads sleep and coroutines await.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+            return slot - now
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Bucket upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram, safe to update from many threads"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self._counts = [0] * len(buckets)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.errors = 0
+
+    def observe(self, elapsed_ms, error=False):
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if elapsed_ms <= bound:
+                    self._counts[i] += 1
+                    break
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if error:
+                self.errors += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'count': self.count,
+                'errors': self.errors,
+                'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+                'buckets_ms': {
+                    ('+Inf' if bound == float('inf') else str(bound)): n
+                    for bound, n in zip(self.buckets, self._counts)
+                },
+            }
+
+
+class UpstreamSession(requests.Session):
+    """
+    requests.Session for a single upstream.
+
+    Applies a default (connect, read) timeout when the caller passes none and
+    records the latency of every call, retries included, in `histogram`.
+    Retries run here rather than in urllib3 so a call can take a `deadline`
+    (time.monotonic() value): every attempt's timeout is capped to the time
+    left, and no retry starts once its backoff would run past it.
+    With `min_interval` every attempt, retries included, first waits its
+    turn on the session's RateLimiter.
+    """
+
+    def __init__(self, name, timeout=None, pool_size=UPSTREAM_POOL_SIZE,
+                 retries=UPSTREAM_RETRIES, retry_methods=('GET', 'HEAD'),
+                 retry_statuses=RETRY_STATUSES, min_interval=0):
+        super().__init__()
+        self.name = name
+        self.timeout = timeout or (UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT)
+        self.retries = retries
+        self.retry_methods = frozenset(retry_methods)
+        self.retry_statuses = frozenset(retry_statuses)
+        self.limiter = RateLimiter(min_interval) if min_interval > 0 else None
+        self.histogram = LatencyHistogram()
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, deadline=None, **kwargs):
+        """
+        Session.request with this upstream's retry policy: connect errors
+        always retried, read errors and retry_statuses only for
+        retry_methods, retry_delay() between attempts (Retry-After ignored),
+        and the last response returned as is
+        """
+        timeout = kwargs.pop('timeout', None) or self.timeout
+        retryable = method.upper() in self.retry_methods
+        start = time.perf_counter()
+        error = True
+        try:
+            for attempt in range(self.retries + 1):
+                delay = retry_delay(attempt + 1)
+                if self.limiter is not None:
+                    self.limiter.wait()
+                try:
+                    response = super().request(method, url, timeout=attempt_timeout(timeout, deadline), **kwargs)
+                except requests.RequestException as e:
+                    if not (retryable or is_connect_error(e)) or not self._can_retry(attempt, delay, deadline):
+                        raise
+                else:
+                    if (not retryable or response.status_code not in self.retry_statuses
+                            or not self._can_retry(attempt, delay, deadline)):
+                        error = response.status_code >= 500 or response.status_code == 429
+                        return response
+                    response.close()
+                time.sleep(delay)
+        finally:
+            self.histogram.observe((time.perf_counter() - start) * 1000, error=error)
+
+    def _can_retry(self, attempt, delay, deadline):
+        """Whether another attempt may follow attempt number `attempt` (0-based) after `delay`"""
+        if attempt >= self.retries:
+            return False
+        return deadline is None or time.monotonic() + delay < deadline
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name, **kwargs):
+    """Shared UpstreamSession for `name`, created on first use"""
+    session = _sessions.get(name)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(name)
+            if session is None:
+                session = _sessions[name] = UpstreamSession(name, **kwargs)
+    return session
+
+
+def upstream_stats():
+    """Latency histograms for every upstream used so far"""
+    return {name: session.histogram.stats() for name, session in _sessions.items()}